@@ -0,0 +1 @@
+# Shared helpers used by several apps
@@ -0,0 +1,151 @@
+"""
+Generation-versioned response cache for public catalog reads.
+
+Each namespace ("products", "stores") has a generation counter stored in the
+cache. Response keys embed the current generations of the namespaces they
+depend on, so invalidating a namespace is a single INCR: old entries simply
+stop being addressed and expire through their TTL. No key scans needed.
+
+Every process must share the cache, or a write only invalidates the process
+that made it; CATALOG_CACHE_ENABLED is off by default without a shared
+CACHE_BACKEND, and responses are then never cached.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date
+from rest_framework.response import Response
+
+from .conditional import not_modified_response, set_validator_headers
+
+KEY_PREFIX = 'catalog'
+STATS_KEYS = {
+    'hits': f'{KEY_PREFIX}:stats:hits',
+    'misses': f'{KEY_PREFIX}:stats:misses',
+}
+
+
+def is_enabled():
+    return getattr(settings, 'CATALOG_CACHE_ENABLED', True)
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(namespace):
+    return f'{KEY_PREFIX}:gen:{namespace}'
+
+
+def _seed_generation(cache, key):
+    """
+    Start a missing generation counter (first use or evicted).
+
+    Seeding from the clock rather than 0 guarantees a restarted counter never
+    re-addresses responses cached under an earlier generation.
+    """
+    cache.add(key, time.time_ns() // 1000, timeout=None)
+    return cache.get(key)
+
+
+def _incr(cache, key, initial=1):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Counter missing. add() is atomic, so a concurrent creator makes us
+        # fall back to incr().
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def get_generations(namespaces):
+    """Return the current generation of each namespace in one round trip."""
+    cache = get_cache()
+    keys = [_generation_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else _seed_generation(cache, key)
+        for key in keys
+    ]
+
+
+def bump_generation(namespace):
+    """Invalidate every cached response that depends on namespace."""
+    key = _generation_key(namespace)
+    _incr(get_cache(), key, initial=time.time_ns() // 1000)
+
+
+def bump_generation_on_commit(namespace):
+    """
+    Bump after the current transaction commits, so no request can cache
+    pre-commit data under the new generation.
+    """
+    transaction.on_commit(lambda: bump_generation(namespace))
+
+
+def record(outcome):
+    _incr(get_cache(), STATS_KEYS[outcome])
+
+
+def get_stats():
+    found = get_cache().get_many(list(STATS_KEYS.values()))
+    return {name: found.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def reset_stats():
+    get_cache().delete_many(list(STATS_KEYS.values()))
+
+
+def build_response_key(request, namespaces):
+    generations = get_generations(namespaces)
+    version = '.'.join(f'{ns}{gen}' for ns, gen in zip(namespaces, generations))
+    query = sorted(request.query_params.lists())
+    digest = hashlib.sha1(f'{request.path}?{query}'.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:resp:{version}:{digest}'
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses of public read endpoints.
+
+    Set cache_namespaces to every namespace the payload depends on. Responses
+    carry an X-Cache header (HIT or MISS). ETag/Last-Modified headers set by
+    ConditionalResponseMixin are cached too, so conditional requests that hit
+    the cache are answered with 304 without touching the database.
+    """
+
+    cache_namespaces = ()
+    cache_timeout = None
+
+    def get(self, request, *args, **kwargs):
+        if not is_enabled():
+            return super().get(request, *args, **kwargs)
+        cache = get_cache()
+        key = build_response_key(request, self.cache_namespaces)
+
+        entry = cache.get(key)
+        if entry is not None:
+            record('hits')
+            response = not_modified_response(request, entry['etag'], entry['last_modified'])
+            if response is None:
+                response = Response(entry['data'])
+                set_validator_headers(response, entry['etag'], entry['last_modified'])
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record('misses')
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout or getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+            last_modified = response.get('Last-Modified')
+            cache.set(key, {
+                'data': response.data,
+                'etag': response.get('ETag'),
+                'last_modified': parse_http_date(last_modified) if last_modified else None,
+            }, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,64 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read endpoints.
+
+Views compute cheap validators (e.g. a row's updated_at, or the rows of the
+requested page) before any serializer runs. When the client's If-None-Match / If-Modified-Since
+headers still match, a 304 is returned straight away.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(parts):
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return 'W/' + quote_etag(digest)
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 response if the request's validators match, else None."""
+    return get_conditional_response(
+        getattr(request, '_request', request),
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def set_validator_headers(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+
+
+class ConditionalResponseMixin:
+    """
+    Answer GET requests with 304 Not Modified when nothing has changed.
+
+    Subclasses implement get_validators() returning (parts, last_modified):
+    parts is a sequence of values hashed into the ETag and last_modified a
+    datetime (or None). Returning None skips conditional handling, e.g. when
+    the object does not exist and the normal 404 path should run.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        parts, last_modified = validators
+        etag = make_etag(parts)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = not_modified_response(request, etag, timestamp)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validator_headers(response, etag, timestamp)
+        return response
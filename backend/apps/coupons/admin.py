@@ -12,7 +12,7 @@ class CouponAdmin(admin.ModelAdmin):
     fieldsets = (
         ('Coupon Info', {'fields': ('code', 'description', 'discount')}),
         ('Eligibility', {'fields': ('for_new_user', 'for_member', 'is_public')}),
-        ('Validity', {'fields': ('expires_at',)}),
+        ('Validity', {'fields': ('expires_at', 'max_uses', 'max_uses_per_user')}),
     )
 
     def is_valid(self, obj):
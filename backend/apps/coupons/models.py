@@ -11,6 +11,9 @@ class Coupon(models.Model):
     for_new_user = models.BooleanField(default=False)
     for_member = models.BooleanField(default=False)
     is_public = models.BooleanField(default=False)
+    # Checkouts allowed in total and per user; blank means unlimited.
+    max_uses = models.PositiveIntegerField(null=True, blank=True)
+    max_uses_per_user = models.PositiveIntegerField(null=True, blank=True)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    ordering = ('-created_at',)
+    # Bodies can contain password reset links; never show them.
+    exclude = ('body', 'html_body')
+    readonly_fields = ('subject', 'from_email', 'to', 'attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ('retry_now',)
+
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        # Sent and failed emails have had their bodies blanked.
+        queryset.filter(status=OutboundEmail.Status.PENDING).update(
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.outbox import prune_outbound_emails
+
+
+class Command(BaseCommand):
+    help = 'Delete sent and failed outbox emails older than EMAIL_OUTBOX_RETENTION.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None, help='Age in seconds; defaults to EMAIL_OUTBOX_RETENTION.')
+
+    def handle(self, *args, **options):
+        deleted = prune_outbound_emails(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} email(s).'))
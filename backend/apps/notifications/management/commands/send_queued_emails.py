@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = (
+        'Send the emails waiting in the outbox, retrying failures with backoff. '
+        'Run it every minute, or keep it running with --loop. Several workers can run at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_emails(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Sent {sent} email(s), {failed} failed attempt(s).'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
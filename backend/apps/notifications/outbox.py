@@ -0,0 +1,159 @@
+"""
+Transactional email outbox.
+
+queue_email() only inserts an OutboundEmail row, so a request never waits
+on the email provider, and the email is dropped if the request's
+transaction rolls back. send_queued_emails() (run by the send_queued_emails
+command) delivers them through EMAIL_BACKEND in batches:
+
+1. A short transaction claims a batch with SKIP LOCKED and leases it by
+   pushing next_attempt_at forward, so other workers skip it.
+2. The emails are sent outside any transaction over one connection.
+3. Sent emails are marked in one UPDATE. Failed ones are retried with
+   exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+
+A worker that dies mid-batch loses only its lease: the emails are picked up
+again once it expires.
+
+Bodies can hold secrets such as password reset links, so they are blanked
+once an email is sent or given up on, and prune_outbound_emails() deletes
+those rows after EMAIL_OUTBOX_RETENTION.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+LEASE = timedelta(minutes=5)
+
+
+def get_max_attempts():
+    return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+
+
+def get_retry_delay():
+    return getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60)
+
+
+def get_retention():
+    return getattr(settings, 'EMAIL_OUTBOX_RETENTION', 604800)
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base * 2^(attempts-1), up to a day, with jitter."""
+    seconds = min(get_retry_delay() * 2 ** max(attempts - 1, 0), 86400)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def queue_email(subject, to, body='', html_body='', from_email=None):
+    """Add an email to the outbox; to is an address or a list of them."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        to=[to] if isinstance(to, str) else list(to),
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def _claim(batch_size, now):
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if ids:
+            OutboundEmail.objects.filter(pk__in=ids).update(
+                next_attempt_at=now + LEASE,
+                attempts=F('attempts') + 1,
+            )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _record_failure(email, error):
+    give_up = email.attempts >= get_max_attempts()
+    fields = {'body': '', 'html_body': ''} if give_up else {}
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=OutboundEmail.Status.FAILED if give_up else OutboundEmail.Status.PENDING,
+        next_attempt_at=timezone.now() + retry_delay(email.attempts),
+        last_error=f'{type(error).__name__}: {error}'[:2000],
+        **fields,
+    )
+
+
+def send_queued_emails(batch_size=50):
+    """
+    Send due emails until none are left. Returns (sent, failed attempts).
+    """
+    sent = failed = 0
+    while True:
+        emails = _claim(batch_size, timezone.now())
+        if not emails:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            # Could not even connect: the whole batch is retried later.
+            for email in emails:
+                _record_failure(email, exc)
+            return sent, failed + len(emails)
+
+        delivered = []
+        try:
+            for email in emails:
+                try:
+                    _message(email, connection).send()
+                except Exception as exc:
+                    _record_failure(email, exc)
+                    failed += 1
+                else:
+                    delivered.append(email.pk)
+        finally:
+            OutboundEmail.objects.filter(pk__in=delivered).update(
+                status=OutboundEmail.Status.SENT,
+                sent_at=timezone.now(),
+                last_error='',
+                body='',
+                html_body='',
+            )
+            connection.close()
+        sent += len(delivered)
+
+
+def prune_outbound_emails(max_age=None):
+    """
+    Delete sent and failed emails older than max_age seconds
+    (EMAIL_OUTBOX_RETENTION by default). Returns the number deleted.
+    """
+    if max_age is None:
+        max_age = get_retention()
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    deleted, _ = OutboundEmail.objects.filter(
+        status__in=[OutboundEmail.Status.SENT, OutboundEmail.Status.FAILED],
+        created_at__lt=cutoff,
+    ).delete()
+    return deleted
@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import (
+    CouponRedemption,
+    DailyStoreSales,
+    IdempotencyKey,
+    Order,
+    OrderItem,
+    OrderStatusHistory,
+    StockReservation,
+    StripeEvent,
+)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -8,6 +17,12 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ('product', 'quantity', 'price')
 
 
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    readonly_fields = ('from_status', 'to_status', 'changed_by', 'created_at')
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'store', 'total', 'status', 'is_paid', 'created_at')
@@ -15,7 +30,7 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ('id', 'user__email', 'store__name')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
 
     fieldsets = (
         ('Order Info', {'fields': ('user', 'store', 'address')}),
@@ -34,3 +49,52 @@ class OrderItemAdmin(admin.ModelAdmin):
 
     def subtotal(self, obj):
         return obj.subtotal
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'expires_at', 'created_at')
+    search_fields = ('id', 'user__email')
+    ordering = ('expires_at',)
+    readonly_fields = ('user', 'items', 'from_cart', 'expires_at', 'created_at')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'status_code', 'created_at')
+    search_fields = ('key', 'user__email')
+    ordering = ('-created_at',)
+    readonly_fields = ('user', 'key', 'fingerprint', 'status_code', 'response', 'created_at')
+
+
+@admin.register(DailyStoreSales)
+class DailyStoreSalesAdmin(admin.ModelAdmin):
+    list_display = ('store', 'date', 'order_count', 'revenue', 'items_sold', 'paid_order_count', 'cod_order_count')
+    list_filter = ('date',)
+    search_fields = ('store__name',)
+    ordering = ('-date',)
+    readonly_fields = (
+        'store', 'date', 'order_count', 'revenue', 'items_sold', 'paid_order_count', 'paid_revenue',
+        'cod_order_count', 'cod_revenue', 'placed_order_count', 'processing_order_count',
+        'shipped_order_count', 'delivered_order_count', 'updated_at',
+    )
+
+
+@admin.register(CouponRedemption)
+class CouponRedemptionAdmin(admin.ModelAdmin):
+    list_display = ('coupon', 'order', 'user', 'discount', 'discount_amount', 'total', 'created_at')
+    list_filter = ('coupon',)
+    search_fields = ('coupon__code', 'order__id', 'user__email')
+    ordering = ('-created_at',)
+    readonly_fields = (
+        'coupon', 'order', 'user', 'checkout', 'discount', 'discount_amount', 'total', 'created_at',
+    )
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'type', 'received_at', 'processed_at')
+    list_filter = ('type',)
+    search_fields = ('id',)
+    ordering = ('-received_at',)
+    readonly_fields = ('id', 'type', 'payload', 'received_at', 'processed_at')
@@ -0,0 +1,124 @@
+"""
+Server-side cart operations.
+
+The cart stays in User.cart ({product_id: quantity}), which checkout reads,
+but clients change it with operations (add, remove, set, delete, clear)
+instead of rewriting it. Each batch is applied to the row read under a lock
+and written back with one UPDATE of the cart column, so tabs changing the
+cart at the same time never overwrite each other.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.products.models import Product
+
+User = get_user_model()
+
+MAX_QUANTITY = 1000
+MAX_LINES = 100
+
+
+class CartFull(Exception):
+    """The operations would leave more than MAX_LINES products in the cart."""
+
+
+def _quantity(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def apply_operation(cart, operation):
+    """Apply one operation ({'op', 'product', 'quantity'}) to a cart dict in place."""
+    op = operation['op']
+    if op == 'clear':
+        cart.clear()
+        return
+
+    product_id = operation['product']
+    current = _quantity(cart.get(product_id))
+    if op == 'add':
+        quantity = current + operation['quantity']
+    elif op == 'remove':
+        quantity = current - operation['quantity']
+    elif op == 'set':
+        quantity = operation['quantity']
+    else:  # delete
+        quantity = 0
+
+    if quantity > 0:
+        cart[product_id] = min(quantity, MAX_QUANTITY)
+    else:
+        cart.pop(product_id, None)
+
+
+def apply_cart_operations(user, operations):
+    """
+    Apply operations to the user's saved cart atomically and return the new
+    cart. Raises CartFull, leaving the cart unchanged.
+    """
+    with transaction.atomic():
+        cart = (
+            User.objects
+            .select_for_update()
+            .filter(pk=user.pk)
+            .values_list('cart', flat=True)
+            .get()
+        ) or {}
+        lines = len(cart)
+        for operation in operations:
+            apply_operation(cart, operation)
+        if len(cart) > max(MAX_LINES, lines):
+            raise CartFull(len(cart))
+        User.objects.filter(pk=user.pk).update(cart=cart)
+
+    user.cart = cart
+    return cart
+
+
+def priced_cart(cart):
+    """
+    Resolve a cart's products, prices and stock with one query.
+    Products that no longer exist are listed under "missing".
+    """
+    products = (
+        Product.objects
+        .select_related('store')
+        .only(
+            'id', 'name', 'images', 'mrp', 'price', 'in_stock', 'stock',
+            'store__id', 'store__name', 'store__username', 'store__is_active',
+        )
+        .in_bulk(list(cart))
+    )
+
+    lines = []
+    missing = []
+    for product_id, quantity in cart.items():
+        product = products.get(product_id)
+        quantity = _quantity(quantity)
+        if product is None or not quantity:
+            missing.append(product_id)
+            continue
+        in_stock = product.in_stock if product.stock is None else product.stock >= quantity
+        lines.append({
+            'product': product.pk,
+            'name': product.name,
+            'image': product.images[0] if product.images else None,
+            'mrp': product.mrp,
+            'price': product.price,
+            'quantity': quantity,
+            'subtotal': product.price * quantity,
+            'stock': product.stock,
+            'store': product.store_id,
+            'store_name': product.store.name,
+            'store_username': product.store.username,
+            'available': in_stock and product.store.is_active,
+        })
+
+    return {
+        'items': lines,
+        'quantity': sum(line['quantity'] for line in lines),
+        'subtotal': sum((line['subtotal'] for line in lines if line['available']), 0),
+        'missing': missing,
+    }
@@ -0,0 +1,93 @@
+"""
+Transactional multi-store checkout.
+
+A cart may hold products from several stores; checkout creates one Order per
+store. All orders and items are written with two bulk inserts inside one
+transaction, so the number of queries does not grow with the cart size.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.products.rankings import record_order_items
+
+from .coupons import lock_coupon, record_redemptions
+from .models import Order, OrderItem
+from .reservations import claim_reservation, take_stock
+from .rollups import record_orders
+
+CENT = Decimal('0.01')
+
+
+def coupon_snapshot(coupon):
+    """Freeze the coupon terms on the order, so later edits don't change it."""
+    return {'code': coupon.code, 'discount': str(coupon.discount)}
+
+
+def apply_discount(amount, coupon):
+    if coupon is None:
+        return amount.quantize(CENT)
+    return (amount * (100 - coupon.discount) / 100).quantize(CENT)
+
+
+def place_orders(user, address, payment_method, quantities, products, coupon=None,
+                 reservation=None, clear_cart=False):
+    """
+    Create one order per store for the given cart.
+
+    quantities maps product_id to quantity and products maps product_id to a
+    Product loaded with its store. Stock is taken from the reservation when
+    one is given, otherwise straight from inventory. Raises InsufficientStock,
+    ReservationExpired or CouponUnavailable, leaving nothing written. Returns
+    the created orders.
+    """
+    by_store = defaultdict(list)
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        by_store[product.store_id].append((product, quantity))
+
+    orders = []
+    items = []
+    subtotals = {}
+    for store_id, lines in by_store.items():
+        subtotal = sum(product.price * quantity for product, quantity in lines)
+        order = Order(
+            id=Order.generate_id(),
+            user=user,
+            store_id=store_id,
+            address=address,
+            payment_method=payment_method,
+            total=apply_discount(subtotal, coupon),
+            is_coupon_used=coupon is not None,
+            coupon=coupon_snapshot(coupon) if coupon else {},
+        )
+        orders.append(order)
+        subtotals[order.id] = subtotal
+        items.extend(
+            OrderItem(order=order, product=product, quantity=quantity, price=product.price)
+            for product, quantity in lines
+        )
+
+    with transaction.atomic():
+        if coupon is not None:
+            lock_coupon(coupon, user)
+        if reservation is not None:
+            claim_reservation(reservation)
+        else:
+            take_stock(quantities)
+        Order.objects.bulk_create(orders)
+        for item in items:
+            item.created_at = item.order.created_at
+        OrderItem.objects.bulk_create(items)
+        if coupon is not None:
+            record_redemptions(coupon, orders, subtotals)
+        # bulk_create sends no signals: update rankings and rollups here.
+        record_order_items(items)
+        record_orders(orders, items)
+
+        if clear_cart:
+            user.cart = {}
+            user.save(update_fields=['cart'])
+
+    return orders
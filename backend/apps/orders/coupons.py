@@ -0,0 +1,91 @@
+"""
+Coupon redemptions.
+
+Every order placed with a coupon gets a CouponRedemption row in the checkout
+transaction, so usage limits and per-coupon reports are index lookups on
+that table instead of scans over the Order.coupon JSON snapshots.
+"""
+from django.db.models import Count, Sum
+
+from apps.coupons.models import Coupon
+
+from .models import CouponRedemption
+
+
+class CouponUnavailable(Exception):
+    """The coupon has reached its usage limit (overall or for the user)."""
+
+
+def count_uses(coupon, user=None):
+    """Number of checkouts that used coupon, optionally only by user."""
+    redemptions = CouponRedemption.objects.filter(coupon=coupon)
+    if user is not None:
+        redemptions = redemptions.filter(user=user)
+    return redemptions.values('checkout').distinct().count()
+
+
+def check_usage_limits(coupon, user, max_uses, max_uses_per_user):
+    """Raise CouponUnavailable if user may not use coupon once more."""
+    if max_uses is not None and count_uses(coupon) >= max_uses:
+        raise CouponUnavailable(coupon.code)
+    if max_uses_per_user is not None and count_uses(coupon, user) >= max_uses_per_user:
+        raise CouponUnavailable(coupon.code)
+
+
+def lock_coupon(coupon, user):
+    """
+    Lock a limited coupon's row and check its usage limits.
+    Must run inside the checkout transaction, so concurrent checkouts using
+    the coupon are serialized and cannot overshoot the limits.
+    """
+    if coupon.max_uses is None and coupon.max_uses_per_user is None:
+        return
+    limits = (
+        Coupon.objects
+        .select_for_update()
+        .filter(pk=coupon.pk)
+        .values_list('max_uses', 'max_uses_per_user')
+        .first()
+    )
+    if limits is None:
+        raise CouponUnavailable(coupon.code)
+    check_usage_limits(coupon, user, *limits)
+
+
+def record_redemptions(coupon, orders, subtotals):
+    """
+    Insert one redemption per order; subtotals maps order id to the order's
+    amount before the discount.
+    """
+    checkout = orders[0].id
+    CouponRedemption.objects.bulk_create([
+        CouponRedemption(
+            coupon=coupon,
+            order=order,
+            user_id=order.user_id,
+            checkout=checkout,
+            discount=coupon.discount,
+            discount_amount=subtotals[order.id] - order.total,
+            total=order.total,
+            created_at=order.created_at,
+        )
+        for order in orders
+    ])
+
+
+def coupon_report(redemptions=None):
+    """Per-coupon checkouts, orders, buyers, revenue and discounts given."""
+    if redemptions is None:
+        redemptions = CouponRedemption.objects.all()
+    return (
+        redemptions
+        .values('coupon')
+        .annotate(
+            checkouts=Count('checkout', distinct=True),
+            orders=Count('id'),
+            buyers=Count('user', distinct=True),
+            revenue=Sum('total'),
+            discount_amount=Sum('discount_amount'),
+        )
+        .order_by('-checkouts', 'coupon')
+    )
@@ -0,0 +1,84 @@
+"""
+Streaming CSV export of a store's orders.
+
+Rows are one per order item with the order's columns repeated, read through
+a server-side cursor and written one line at a time, so memory use does not
+grow with the number of orders exported. Text cells that a spreadsheet
+would read as a formula are prefixed with a quote.
+"""
+import csv
+import io
+
+from .models import OrderItem
+
+# (CSV column, OrderItem lookup)
+EXPORT_COLUMNS = (
+    ('order_id', 'order_id'),
+    ('created_at', 'order__created_at'),
+    ('status', 'order__status'),
+    ('payment_method', 'order__payment_method'),
+    ('is_paid', 'order__is_paid'),
+    ('order_total', 'order__total'),
+    ('buyer_name', 'order__user__name'),
+    ('buyer_email', 'order__user__email'),
+    ('ship_city', 'order__address__city'),
+    ('ship_state', 'order__address__state'),
+    ('ship_zip', 'order__address__zip'),
+    ('ship_country', 'order__address__country'),
+    ('product_id', 'product_id'),
+    ('product_name', 'product__name'),
+    ('quantity', 'quantity'),
+    ('price', 'price'),
+)
+EXPORT_FIELDS = tuple(column for column, _ in EXPORT_COLUMNS) + ('subtotal',)
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_formula(value):
+    """Keep buyer- and seller-entered text from running as a spreadsheet formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _export_rows(store, start, end, status, chunk_size):
+    queryset = OrderItem.objects.filter(order__store=store)
+    # Items share their order's created_at, so both tables can be pruned.
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start, order__created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end, order__created_at__lt=end)
+    if status:
+        queryset = queryset.filter(order__status=status)
+
+    queryset = (
+        queryset
+        .order_by('created_at', 'order_id', 'id')
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    )
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def export_orders_csv(store, start=None, end=None, status=None, chunk_size=2000):
+    """
+    Yield the store's order items as CSV text, one line at a time.
+    start and end are aware datetimes bounding created_at (end exclusive).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for values in _export_rows(store, start, end, status, chunk_size):
+        row = dict(zip(EXPORT_FIELDS, values))
+        row['created_at'] = row['created_at'].isoformat()
+        row['subtotal'] = row['price'] * row['quantity']
+        writer.writerow([escape_formula(row[field]) for field in EXPORT_FIELDS])
+        yield flush()
@@ -0,0 +1,135 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first request with a key claims a row keyed on (user, key) and stores
+its response. Replays are answered from that row without running the view
+again, so a retried checkout never places a second set of orders.
+
+A claim without a response is a lease: if the worker running it died (a
+timeout or OOM kill skips the cleanup), a retry of the same request takes
+the key over once IDEMPOTENCY_KEY_LEASE seconds have passed.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    """Hash what makes a request distinct, so a reused key can be detected."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{body}'.encode('utf-8')).hexdigest()
+
+
+def get_lease():
+    return getattr(settings, 'IDEMPOTENCY_KEY_LEASE', 180)
+
+
+def take_over_abandoned(record, fingerprint):
+    """
+    Claim a record whose request never finished, if its lease has run out.
+    The conditional UPDATE lets only one retry win.
+    """
+    now = timezone.now()
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk,
+        status_code__isnull=True,
+        fingerprint=fingerprint,
+        created_at__lt=now - timedelta(seconds=get_lease()),
+    ).update(created_at=now)
+    if taken:
+        record.created_at = now
+    return bool(taken)
+
+
+def claim_key(user, key, fingerprint):
+    """Return (record, created); created is False when the key was already used."""
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is not None:
+                return record, take_over_abandoned(record, fingerprint)
+            # The other request failed and released the key; claim it again.
+    return IdempotencyKey.objects.get(user=user, key=key), False
+
+
+def replay(record, fingerprint):
+    """Answer a request whose key was seen before."""
+    if record.fingerprint != fingerprint:
+        return Response(
+            {'detail': f'{HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.status_code is None:
+        return Response(
+            {'detail': 'A request with this Idempotency-Key is still being processed.'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    response = Response(record.response, status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """
+    Make a POST view method honour the Idempotency-Key header.
+
+    Responses returned by the view are stored and replayed, except server
+    errors. Exceptions (validation errors included) and server errors release
+    the key, so the client can fix the request or retry. Requests without
+    the header run as usual.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise serializers.ValidationError({HEADER: f'Must be 1 to {MAX_KEY_LENGTH} characters.'})
+
+        fingerprint = request_fingerprint(request)
+        record, created = claim_key(request.user, key, fingerprint)
+        if not created:
+            return replay(record, fingerprint)
+
+        # Only touch the claim while it is still ours: after the lease runs
+        # out a retry may have taken it over.
+        claim = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at, status_code__isnull=True)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            claim.delete()
+            raise
+
+        if response.status_code >= 500:
+            claim.delete()
+        else:
+            claim.update(status_code=response.status_code, response=response.data)
+        return response
+
+    return wrapper
+
+
+def prune_idempotency_keys(max_age=None):
+    """Delete keys older than max_age seconds (IDEMPOTENCY_KEY_TTL by default)."""
+    if max_age is None:
+        max_age = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.models import Order
+from apps.orders.payments import get_webhook_secret, sign_payload
+
+
+def fake_event(order, event_type):
+    """A Stripe-shaped event paying for one order."""
+    return {
+        'id': f'evt_{uuid.uuid4().hex}',
+        'object': 'event',
+        'type': event_type,
+        'created': int(time.time()),
+        'livemode': False,
+        'data': {
+            'object': {
+                'id': f'cs_test_{uuid.uuid4().hex}',
+                'object': 'checkout.session',
+                'payment_status': 'paid',
+                'amount_total': int(order.total * 100),
+                'currency': settings.STRIPE_CURRENCY,
+                'metadata': {'order_ids': order.pk},
+            },
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Send signed fake Stripe events for unpaid Stripe orders to the webhook, '
+        'each several times to exercise deduplication, and report the ack times. '
+        'Run process_stripe_events afterwards to apply them. Development only.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/orders/stripe/webhook/')
+        parser.add_argument('--orders', type=int, default=100, help='Number of unpaid Stripe orders to pay.')
+        parser.add_argument('--duplicates', type=int, default=2, help='Times each event is delivered.')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--type', default='checkout.session.completed', dest='event_type')
+
+    def handle(self, *args, **options):
+        secret = get_webhook_secret()
+        if not secret:
+            raise CommandError('Set STRIPE_WEBHOOK_SECRET first.')
+
+        orders = list(
+            Order.objects
+            .filter(payment_method=Order.PaymentMethod.STRIPE, is_paid=False)
+            .order_by('-created_at')[:options['orders']]
+        )
+        if not orders:
+            raise CommandError('No unpaid Stripe orders.')
+
+        deliveries = [
+            json.dumps(fake_event(order, options['event_type']))
+            for order in orders
+        ] * max(options['duplicates'], 1)
+
+        statuses = {}
+        timings = []
+        lock = threading.Lock()
+
+        def send(payload):
+            request = urllib.request.Request(
+                options['url'],
+                data=payload.encode('utf-8'),
+                headers={'Content-Type': 'application/json', 'Stripe-Signature': sign_payload(payload, secret)},
+                method='POST',
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    code = response.status
+            except urllib.error.HTTPError as exc:
+                code = exc.code
+            except urllib.error.URLError as exc:
+                code = f'error: {exc.reason}'
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                statuses[code] = statuses.get(code, 0) + 1
+                timings.append(elapsed)
+
+        def worker():
+            while True:
+                with lock:
+                    if not deliveries:
+                        return
+                    payload = deliveries.pop()
+                send(payload)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(f'Sent {len(timings)} request(s) for {len(orders)} order(s): {statuses}.')
+        self.stdout.write(self.style.SUCCESS(f'Ack time p50 {p50:.1f} ms, p99 {p99:.1f} ms.'))
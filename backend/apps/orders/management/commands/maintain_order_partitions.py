@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Create upcoming Order/OrderItem partitions and optionally detach old ones '
+        '(PostgreSQL only). Run it at least once a month.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=None,
+                            help='Partitions to create after the current one (default ORDER_PARTITION_AHEAD).')
+        parser.add_argument('--retain-months', type=int, default=None,
+                            help='Detach partitions entirely older than this many months.')
+        parser.add_argument('--archive-schema', default=None,
+                            help='Move detached partitions to this schema instead of leaving them in place.')
+        parser.add_argument('--drop', action='store_true', help='Drop detached partitions.')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the partitions that would be detached.')
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported():
+            self.stdout.write('Order tables are only partitioned on PostgreSQL; nothing to do.')
+            return
+        if not all(partitioning.is_partitioned(table) for table in partitioning.TABLES):
+            raise CommandError('Order tables are not partitioned; run migrations first.')
+        if options['drop'] and options['archive_schema']:
+            raise CommandError('Use either --drop or --archive-schema, not both.')
+
+        if not options['dry_run']:
+            created = partitioning.create_partitions(options['ahead'])
+            self.stdout.write(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}.")
+
+        if options['retain_months'] is not None:
+            old = partitioning.old_partitions(options['retain_months'])
+            names = ', '.join(name for _, name in old) or 'none'
+            if options['dry_run']:
+                self.stdout.write(f'Would detach: {names}.')
+                return
+            partitioning.detach_partitions(old, archive_schema=options['archive_schema'], drop=options['drop'])
+            self.stdout.write(f'Detached: {names}.')
+
+        self.stdout.write(self.style.SUCCESS('Order partitions are up to date.'))
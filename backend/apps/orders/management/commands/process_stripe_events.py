@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.payments import process_stripe_events
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply queued Stripe webhook events (mark orders paid). Run it every minute, '
+        'or keep it running with --loop. Several workers can run at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed, paid = process_stripe_events(batch_size=options['batch_size'])
+            if processed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Processed {processed} event(s), marked {paid} order(s) paid.'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
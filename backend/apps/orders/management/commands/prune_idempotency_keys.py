@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.idempotency import prune_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None, help='Age in seconds; defaults to IDEMPOTENCY_KEY_TTL.')
+
+    def handle(self, *args, **options):
+        deleted = prune_idempotency_keys(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} idempotency key(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.rollups import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily sales rollups from order history. Run it while traffic is low.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Sales rollups rebuilt; {rows} store-day row(s).'))
@@ -0,0 +1,97 @@
+import threading
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from apps.orders.checkout import place_orders
+from apps.orders.models import DailyStoreSales, Order
+from apps.products.inventory import InsufficientStock
+from apps.products.models import CategoryFacet, Product
+from apps.stores.models import Store
+from apps.users.models import Address
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Run many simultaneous checkouts for one product and verify that stock is '
+        'never oversold. Creates throwaway users, a store and a product, and deletes '
+        'them afterwards. Meant for development and staging PostgreSQL databases;'
+        ' SQLite serializes writers, so most checkouts fail with "database is locked".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=300)
+        parser.add_argument('--stock', type=int, default=50)
+        parser.add_argument('--quantity', type=int, default=1)
+
+    def handle(self, *args, **options):
+        checkouts, stock, quantity = options['checkouts'], options['stock'], options['quantity']
+        tag = uuid.uuid4().hex[:12]
+
+        seller = User.objects.create_user(email=f'stress-seller-{tag}@example.com', name='Stress', password=None)
+        buyer = User.objects.create_user(email=f'stress-buyer-{tag}@example.com', name='Stress', password=None)
+        try:
+            store = Store.objects.create(
+                user=seller, name='Stress', description='Stress test', username=f'stress-{tag}',
+                address='-', logo='https://example.com/logo.png', email=seller.email, contact='-',
+                status='approved', is_active=True,
+            )
+            product = Product.objects.create(
+                name='Stress', description='Stress test', mrp=1, price=1, category=f'stress-{tag}',
+                store=store, stock=stock,
+            )
+            product = Product.objects.select_related('store').get(pk=product.pk)
+            address = Address.objects.create(
+                user=buyer, name='Stress', email=buyer.email, street='-', city='-',
+                state='-', zip='-', country='-', phone='-',
+            )
+
+            results = {'placed': 0, 'sold_out': 0, 'errors': 0}
+            lock = threading.Lock()
+            barrier = threading.Barrier(checkouts)
+
+            def checkout():
+                outcome = 'placed'
+                try:
+                    barrier.wait()
+                    place_orders(buyer, address, Order.PaymentMethod.COD, {product.pk: quantity}, {product.pk: product})
+                except InsufficientStock:
+                    outcome = 'sold_out'
+                except DatabaseError:
+                    outcome = 'errors'
+                finally:
+                    connection.close()
+                with lock:
+                    results[outcome] += 1
+
+            threads = [threading.Thread(target=checkout) for _ in range(checkouts)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            product.refresh_from_db()
+            orders = Order.objects.filter(store=store).count()
+            self.stdout.write(
+                f"Placed {results['placed']}, sold out {results['sold_out']}, "
+                f"database errors {results['errors']}; stock left {product.stock}, in_stock={product.in_stock}."
+            )
+
+            if results['errors']:
+                raise CommandError(f"{results['errors']} checkout(s) failed with a database error.")
+            sold = orders * quantity
+            if sold > stock or product.stock != stock - sold or orders != results['placed']:
+                raise CommandError(f'Oversold: {orders} order(s) for {stock} unit(s), {product.stock} left.')
+            if product.in_stock != (product.stock > 0):
+                raise CommandError('in_stock does not match the stock level.')
+            self.stdout.write(self.style.SUCCESS('No oversell.'))
+        finally:
+            # Rollup rows outlive their store; drop them so the fake sales do not stay in the stats.
+            DailyStoreSales.objects.filter(store__user=seller).delete()
+            seller.delete()
+            buyer.delete()
+            CategoryFacet.objects.filter(category=f'stress-{tag}').delete()
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_order_created_at(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    OrderItem.objects.update(
+        created_at=Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('created_at')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_orderstatushistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(copy_order_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='order_items', to='orders.order'),
+        ),
+        migrations.AlterField(
+            model_name='orderstatushistory',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='orders.order'),
+        ),
+    ]
@@ -0,0 +1,147 @@
+"""
+Convert Order and OrderItem into tables range-partitioned by created_at.
+
+PostgreSQL only; other databases keep plain tables. Each table is rebuilt:
+the old table is renamed, a partitioned copy is created with partitions
+covering the existing rows, the rows are copied over and the constraints
+and indexes are recreated. Primary and unique keys gain created_at, since
+PostgreSQL requires the partition key in every unique constraint; migration
+0012 restores the uniqueness of Order.id with a separate registry table.
+Future partitions are created by the maintain_order_partitions command.
+
+Both directions run in one transaction and hold an exclusive lock on the
+tables while rows are copied, so run it in a maintenance window. The old
+tables are dropped without CASCADE: if anything else depends on them (a view,
+a foreign key added by hand) the migration fails and rolls back instead of
+dropping it.
+"""
+import re
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations
+
+TABLES = ('Order', 'OrderItem')
+PARTITION_KEY = 'created_at'
+KEY_RE = re.compile(r'^(PRIMARY KEY|UNIQUE) \((?P<columns>.*)\)(?P<rest>.*)$')
+
+
+def add_months(value, months):
+    total = value.year * 12 + value.month - 1 + months
+    return value.replace(year=total // 12, month=total % 12 + 1)
+
+
+def period_start(value, months):
+    index = value.year * 12 + value.month - 1
+    index -= index % months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def capture_definitions(cursor, table):
+    cursor.execute(
+        'SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint '
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+        [f'"{table}"'],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        'SELECT indexname, indexdef FROM pg_indexes '
+        'WHERE schemaname = current_schema() AND tablename = %s',
+        [table],
+    )
+    # Indexes backing constraints are recreated with their constraint.
+    constraint_names = {name for name, _, _ in constraints}
+    indexes = [definition for name, definition in cursor.fetchall() if name not in constraint_names]
+    cursor.execute(
+        'SELECT a.attidentity, pg_get_serial_sequence(%s, \'id\') IS NOT NULL, t.typname '
+        'FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid '
+        "WHERE a.attrelid = %s::regclass AND a.attname = 'id'",
+        [f'"{table}"', f'"{table}"'],
+    )
+    identity, has_sequence, id_type = cursor.fetchone()
+    return constraints, indexes, bool(identity) or has_sequence, id_type
+
+
+def key_definition(definition, partitioned):
+    """Add created_at to (or drop it from) a primary key or unique definition."""
+    match = KEY_RE.match(definition)
+    columns = [column.strip() for column in match.group('columns').split(',')]
+    columns = [column for column in columns if column.strip('"') != PARTITION_KEY]
+    if partitioned:
+        columns.append(PARTITION_KEY)
+    return f"{match.group(1)} ({', '.join(columns)}){match.group('rest')}"
+
+
+def rebuild_table(cursor, table, partitioned, months):
+    old = f'{table}_rebuild'
+    constraints, indexes, autoincrement, id_type = capture_definitions(cursor, table)
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    partition_clause = f' PARTITION BY RANGE ("{PARTITION_KEY}")' if partitioned else ''
+    cursor.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}')
+
+    if partitioned:
+        cursor.execute(f'SELECT MIN("{PARTITION_KEY}") FROM "{old}"')
+        now = datetime.now(timezone.utc)
+        start = period_start(cursor.fetchone()[0] or now, months)
+        end = add_months(period_start(now, months), months * (getattr(settings, 'ORDER_PARTITION_AHEAD', 3) + 1))
+        while start < end:
+            upper = add_months(start, months)
+            cursor.execute(
+                f'CREATE TABLE "{table}_p{start:%Y_%m}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            start = upper
+        # Catches rows outside the pre-created range instead of failing inserts.
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    if autoincrement:
+        # The copied default still uses the old table's sequence, which is
+        # dropped with it; a new sequence is set up below.
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" DROP DEFAULT')
+    cursor.execute(f'DROP TABLE "{old}"')
+
+    if autoincrement:
+        # Identity columns cannot be copied onto partitioned tables; use an
+        # owned sequence, which Django's sequence reset handles the same way.
+        sequence = f'{table}_id_seq'
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" AS {id_type} OWNED BY "{table}"."id"')
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{sequence}"\')')
+        cursor.execute(f'SELECT setval(\'"{sequence}"\', COALESCE(MAX("id"), 0) + 1, false) FROM "{table}"')
+
+    for name, kind, definition in constraints:
+        if kind in ('p', 'u'):
+            definition = key_definition(definition, partitioned)
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    months = getattr(settings, 'ORDER_PARTITION_MONTHS', 1)
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            rebuild_table(cursor, table, partitioned=True, months=months)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            rebuild_table(cursor, table, partitioned=False, months=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_orderitem_created_at'),
+    ]
+
+    operations = [
+        # PostgreSQL only; SQLite keeps plain tables.
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+
+BATCH_SIZE = 1000
+# Orders of one checkout are inserted together, microseconds apart.
+CHECKOUT_WINDOW = timedelta(seconds=1)
+
+
+def backfill_redemptions(apps, schema_editor):
+    """Create redemptions from the coupon snapshots stored on orders."""
+    Coupon = apps.get_model('coupons', 'Coupon')
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    CouponRedemption = apps.get_model('orders', 'CouponRedemption')
+
+    coupons = dict(Coupon.objects.values_list('code', 'discount'))
+    line_total = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2))
+    # A subquery rather than a join and GROUP BY Order.id: on PostgreSQL the
+    # Order primary key is (id, created_at) once partitioned (0008), so the
+    # other Order columns cannot be selected when grouping by id alone.
+    subtotals = (
+        OrderItem.objects
+        .filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(subtotal=Sum(line_total))
+        .values('subtotal')
+    )
+    orders = (
+        Order.objects
+        .filter(is_coupon_used=True)
+        .annotate(subtotal=Subquery(subtotals, output_field=DecimalField(max_digits=12, decimal_places=2)))
+        .order_by('user_id', 'created_at', 'id')
+        .values_list('id', 'user_id', 'store_id', 'coupon', 'total', 'subtotal', 'created_at')
+    )
+
+    batch = []
+    group = None  # (user_id, code, started_at, checkout, store_ids) of the current checkout
+    for order_id, user_id, store_id, snapshot, total, subtotal, created_at in orders.iterator(chunk_size=BATCH_SIZE):
+        code = str((snapshot or {}).get('code') or '')
+        if code not in coupons:
+            code = code.upper()
+        if code not in coupons:
+            continue  # Unknown or deleted coupon: nothing to link to.
+
+        # A checkout has at most one order per store.
+        if (group and group[:2] == (user_id, code) and store_id not in group[4]
+                and created_at - group[2] <= CHECKOUT_WINDOW):
+            group[4].add(store_id)
+        else:
+            group = (user_id, code, created_at, order_id, {store_id})
+        checkout = group[3]
+
+        batch.append(CouponRedemption(
+            coupon_id=code,
+            order_id=order_id,
+            user_id=user_id,
+            checkout=checkout,
+            discount=Decimal(str(snapshot.get('discount', coupons[code]))),
+            discount_amount=max((subtotal or total) - total, Decimal('0')),
+            total=total,
+            created_at=created_at,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            CouponRedemption.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+
+    if batch:
+        CouponRedemption.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0002_coupon_usage_limits'),
+        ('orders', '0008_partition_order_tables'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponRedemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkout', models.CharField(max_length=30)),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('discount_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='redemptions', to='coupons.coupon')),
+                ('order', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='coupon_redemption', to='orders.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_redemptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Coupon Redemption',
+                'verbose_name_plural': 'Coupon Redemptions',
+                'db_table': 'CouponRedemption',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['coupon', 'checkout'], name='CouponRedem_coupon__a61564_idx'), models.Index(fields=['coupon', 'user', 'checkout'], name='CouponRedem_coupon__a619e7_idx'), models.Index(fields=['coupon', 'created_at'], name='CouponRedem_coupon__af66ba_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_redemptions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+STATUS_FIELDS = {
+    'ORDER_PLACED': 'placed_order_count',
+    'PROCESSING': 'processing_order_count',
+    'SHIPPED': 'shipped_order_count',
+    'DELIVERED': 'delivered_order_count',
+}
+
+
+def backfill_status_counts(apps, schema_editor):
+    """Fill the new status counts of existing store rollups from the orders."""
+    Order = apps.get_model('orders', 'Order')
+    DailyStoreSales = apps.get_model('orders', 'DailyStoreSales')
+
+    rows = {(row.store_id, row.date): row for row in DailyStoreSales.objects.filter(store__isnull=False)}
+    counts = (
+        Order.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('store_id', 'day', 'status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for entry in counts:
+        row = rows.get((entry['store_id'], entry['day']))
+        if row is not None and entry['status'] in STATUS_FIELDS:
+            setattr(row, STATUS_FIELDS[entry['status']], entry['count'])
+    DailyStoreSales.objects.bulk_update(rows.values(), list(STATUS_FIELDS.values()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_stripeevent'),
+        ('stores', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='DailySales',
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='delivered_order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='placed_order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='processing_order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='shipped_order_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='dailystoresales',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales', to='stores.store'),
+        ),
+        migrations.AddIndex(
+            model_name='dailystoresales',
+            index=models.Index(fields=['date'], name='DailyStoreS_date_d0e32e_idx'),
+        ),
+        migrations.RunPython(backfill_status_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+"""
+Keep Order.id unique on PostgreSQL and give the order foreign keys a target.
+
+Partitioning (0008) made the Order primary key (id, created_at), so the
+database no longer rejects a duplicate id, and OrderItem, OrderStatusHistory
+and CouponRedemption cannot reference Order directly. The unpartitioned
+"OrderId" table holds one row per order id, kept in step by a trigger on
+Order: a duplicate id fails the insert, and the child tables get real
+(deferred) foreign keys to it. Other databases keep the plain Order table
+and its primary key already guarantees uniqueness.
+"""
+from django.db import migrations
+
+REGISTRY = 'OrderId'
+REFERENCES = (
+    ('OrderItem', 'order_id'),
+    ('OrderStatusHistory', 'order_id'),
+    ('CouponRedemption', 'order_id'),
+)
+
+CREATE_REGISTRY = f'''
+CREATE TABLE "{REGISTRY}" (
+    "id" varchar(30) PRIMARY KEY,
+    "created_at" timestamp with time zone NOT NULL
+);
+INSERT INTO "{REGISTRY}" ("id", "created_at") SELECT "id", "created_at" FROM "Order";
+CREATE INDEX "{REGISTRY}_created_at_idx" ON "{REGISTRY}" ("created_at");
+
+CREATE FUNCTION "{REGISTRY}_sync"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO "{REGISTRY}" ("id", "created_at") VALUES (NEW."id", NEW."created_at");
+        RETURN NEW;
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE "{REGISTRY}" SET "id" = NEW."id", "created_at" = NEW."created_at" WHERE "id" = OLD."id";
+        RETURN NEW;
+    END IF;
+    DELETE FROM "{REGISTRY}" WHERE "id" = OLD."id";
+    RETURN OLD;
+END
+$$;
+
+CREATE TRIGGER "Order_id_registry"
+    AFTER INSERT OR DELETE OR UPDATE OF "id", "created_at" ON "Order"
+    FOR EACH ROW EXECUTE FUNCTION "{REGISTRY}_sync"();
+'''
+
+DROP_REGISTRY = f'''
+DROP TRIGGER "Order_id_registry" ON "Order";
+DROP FUNCTION "{REGISTRY}_sync"();
+DROP TABLE "{REGISTRY}";
+'''
+
+
+def constraint_name(table):
+    return f'{table}_order_id_fk_{REGISTRY}'
+
+
+def add_registry(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_REGISTRY)
+        for table, column in REFERENCES:
+            cursor.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{constraint_name(table)}" '
+                f'FOREIGN KEY ("{column}") REFERENCES "{REGISTRY}" ("id") DEFERRABLE INITIALLY DEFERRED'
+            )
+
+
+def remove_registry(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, _ in REFERENCES:
+            cursor.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT "{constraint_name(table)}"')
+        cursor.execute(DROP_REGISTRY)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_sales_rollups_by_store'),
+    ]
+
+    operations = [
+        # PostgreSQL only, like 0008.
+        migrations.RunPython(add_registry, remove_registry),
+    ]
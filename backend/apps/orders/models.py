@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.coupons.models import Coupon
 from apps.stores.models import Store
 from apps.products.models import Product
 from apps.users.models import Address
@@ -19,6 +22,13 @@ class Order(models.Model):
         COD = 'COD', 'Cash on Delivery'
         STRIPE = 'STRIPE', 'Stripe'
 
+    # Status each status may move to; orders only move forward, one step at a time.
+    STATUS_TRANSITIONS = {
+        OrderStatus.ORDER_PLACED: OrderStatus.PROCESSING,
+        OrderStatus.PROCESSING: OrderStatus.SHIPPED,
+        OrderStatus.SHIPPED: OrderStatus.DELIVERED,
+    }
+
     id = models.CharField(primary_key=True, max_length=30, editable=False)
     total = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(
@@ -62,20 +72,45 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} - {self.user.email}"
 
+    @staticmethod
+    def generate_id():
+        """
+        Generate a CUID-like ID.
+        On PostgreSQL the primary key is (id, created_at); the OrderId
+        registry (migration 0012) rejects a colliding id instead.
+        """
+        return f"cl{secrets.token_urlsafe(16)}"[:30]
+
+    ROLLUP_FIELDS = ('store_id', 'created_at', 'total', 'is_paid', 'payment_method', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so the sales rollups can apply deltas.
+        loaded = {name: instance.__dict__[name] for name in cls.ROLLUP_FIELDS if name in instance.__dict__}
+        instance._loaded_rollup = loaded if len(loaded) == len(cls.ROLLUP_FIELDS) else None
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.id:
-            # Generate CUID-like ID
-            self.id = f"cl{secrets.token_urlsafe(16)}"[:30]
-        super().save(*args, **kwargs)
+            self.id = self.generate_id()
+        # Keep the row and the sales rollups in one transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_rollup = {name: getattr(self, name) for name in self.ROLLUP_FIELDS}
 
 
 class OrderItem(models.Model):
     """Order item model (junction table)."""
 
+    # No foreign key to Order: on PostgreSQL, Order is partitioned and can
+    # only be referenced together with its partition key. Migration 0012
+    # points order_id at the OrderId registry instead.
     order = models.ForeignKey(
         Order,
         on_delete=models.CASCADE,
-        related_name='order_items'
+        related_name='order_items',
+        db_constraint=False
     )
     product = models.ForeignKey(
         Product,
@@ -84,6 +119,8 @@ class OrderItem(models.Model):
     )
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Copied from the order; the partition key on PostgreSQL.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'OrderItem'
@@ -94,6 +131,230 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.product.name} x{self.quantity} in Order {self.order.id}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.order_id is not None:
+            self.created_at = self.order.created_at
+        super().save(*args, **kwargs)
+
     @property
     def subtotal(self):
         return self.quantity * self.price
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a buyer while they pay.
+    Claimed by checkout, or released back to stock once it expires.
+    """
+
+    id = models.CharField(primary_key=True, max_length=30, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='stock_reservations'
+    )
+    items = models.JSONField(default=dict)  # {product_id: quantity}
+    from_cart = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'StockReservation'
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        ordering = ['expires_at']
+
+    def __str__(self):
+        return f"Reservation {self.id} - {self.user.email}"
+
+    def save(self, *args, **kwargs):
+        if not self.id:
+            self.id = Order.generate_id()
+        super().save(*args, **kwargs)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Outcome of a POST sent with an Idempotency-Key header.
+    Replays with the same key get the stored response instead of running
+    the request again. status_code is null while the first request runs.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of method, path and body
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'IdempotencyKey'
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotencykey_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.user_id}"
+
+
+class DailyStoreSales(models.Model):
+    """
+    Order totals per store per day, maintained incrementally by apps.orders.rollups.
+    Platform-wide totals are summed from these rows when read. Rows of a
+    deleted store are kept with store unset, so platform history does not
+    change when a store goes away.
+    """
+
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_sales'
+    )
+    date = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    paid_order_count = models.PositiveIntegerField(default=0)
+    paid_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cod_order_count = models.PositiveIntegerField(default=0)
+    cod_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Orders placed that day by their current status.
+    placed_order_count = models.PositiveIntegerField(default=0)
+    processing_order_count = models.PositiveIntegerField(default=0)
+    shipped_order_count = models.PositiveIntegerField(default=0)
+    delivered_order_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'DailyStoreSales'
+        verbose_name = 'Daily Store Sales'
+        verbose_name_plural = 'Daily Store Sales'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'date'], name='dailystoresales_store_date'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} {self.date}: {self.order_count} orders"
+
+
+class OrderStatusHistory(models.Model):
+    """Audit trail of order status changes."""
+
+    # Checked against the OrderId registry on PostgreSQL, like OrderItem.order.
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='status_history',
+        db_constraint=False
+    )
+    from_status = models.CharField(max_length=20, choices=Order.OrderStatus.choices)
+    to_status = models.CharField(max_length=20, choices=Order.OrderStatus.choices)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='order_status_changes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'OrderStatusHistory'
+        verbose_name = 'Order Status History'
+        verbose_name_plural = 'Order Status History'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['order', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} -> {self.to_status}"
+
+
+class CouponRedemption(models.Model):
+    """
+    One row per order placed with a coupon.
+
+    Orders placed in the same checkout share a checkout id (the id of its
+    first order), so usage limits count checkouts rather than orders.
+    """
+
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.PROTECT,
+        related_name='redemptions'
+    )
+    # Checked against the OrderId registry on PostgreSQL, like OrderItem.order.
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='coupon_redemption',
+        db_constraint=False
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='coupon_redemptions'
+    )
+    checkout = models.CharField(max_length=30)
+    discount = models.DecimalField(max_digits=5, decimal_places=2)  # Percentage at checkout
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    total = models.DecimalField(max_digits=10, decimal_places=2)  # Order total after discount
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'CouponRedemption'
+        verbose_name = 'Coupon Redemption'
+        verbose_name_plural = 'Coupon Redemptions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['coupon', 'checkout']),
+            models.Index(fields=['coupon', 'user', 'checkout']),
+            models.Index(fields=['coupon', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon_id} on Order {self.order_id}"
+
+
+class StripeEvent(models.Model):
+    """
+    Queue of verified Stripe webhook events.
+
+    The webhook only stores the event; process_stripe_events applies it.
+    The primary key is Stripe's event id, so redelivered events are dropped.
+    """
+
+    id = models.CharField(primary_key=True, max_length=255)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'StripeEvent'
+        verbose_name = 'Stripe Event'
+        verbose_name_plural = 'Stripe Events'
+        ordering = ['received_at']
+        indexes = [
+            models.Index(
+                fields=['received_at'],
+                condition=models.Q(processed_at__isnull=True),
+                name='StripeEvent_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.type})"
@@ -0,0 +1,16 @@
+"""
+Pagination classes for order history.
+"""
+from apps.products.pagination import KeysetPagination
+
+
+class OrderCursorPagination(KeysetPagination):
+    """
+    Cursor pagination for order history.
+    Pages on (created_at, id), so the (user, -created_at) and
+    (store, -created_at) indexes serve every page.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,172 @@
+"""
+Maintenance of the PostgreSQL range partitions of Order and OrderItem.
+
+Both tables are partitioned by created_at (see migration 0008) into
+partitions of ORDER_PARTITION_MONTHS months named <table>_pYYYY_MM after
+their first month. Partitions must exist before rows arrive, so
+maintain_order_partitions should run at least monthly; anything outside the
+created range lands in <table>_default and is moved out when its partition
+is created. Old partitions can be detached, moved to an archive schema or
+dropped. Order ids are registered in the unpartitioned OrderId table (see
+migration 0012). Other databases are not partitioned and every function
+here is a no-op for them.
+"""
+import re
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+TABLES = ('Order', 'OrderItem')
+REGISTRY = 'OrderId'
+NAME_RE = re.compile(r'_p(?P<year>\d{4})_(?P<month>\d{2})$')
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def get_interval():
+    return getattr(settings, 'ORDER_PARTITION_MONTHS', 1)
+
+
+def add_months(value, months):
+    total = value.year * 12 + value.month - 1 + months
+    return value.replace(year=total // 12, month=total % 12 + 1)
+
+
+def period_start(value, months=None):
+    """First instant of the partition period containing value."""
+    months = months or get_interval()
+    index = value.year * 12 + value.month - 1
+    index -= index % months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table, start):
+    return f'{table}_p{start:%Y_%m}'
+
+
+def default_partition(table):
+    return f'{table}_default'
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass',
+            [f'"{table}"'],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """Return [(name, start)] for the table's dated partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass',
+            [f'"{table}"'],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = NAME_RE.search(name)
+        if match:
+            start = datetime(int(match['year']), int(match['month']), 1, tzinfo=timezone.utc)
+            partitions.append((name, start))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partitions(ahead=None, now=None):
+    """
+    Create the partitions for the current period and `ahead` periods after
+    it, for every table. Returns the names of the partitions created.
+
+    PostgreSQL refuses to add a partition while the default partition holds
+    rows in its range, so such rows are moved into the new partition before
+    it is attached.
+    """
+    if ahead is None:
+        ahead = getattr(settings, 'ORDER_PARTITION_AHEAD', 3)
+    months = get_interval()
+    first = period_start(now or datetime.now(timezone.utc), months)
+
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in TABLES:
+            existing = {name for name, _ in list_partitions(table)}
+            for offset in range(ahead + 1):
+                start = add_months(first, months * offset)
+                name = partition_name(table, start)
+                if name in existing:
+                    continue
+                create_partition(cursor, table, name, start, add_months(start, months))
+                created.append(name)
+    return created
+
+
+def table_exists(cursor, name):
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [f'"{name}"'])
+    return cursor.fetchone()[0]
+
+
+def create_partition(cursor, table, name, start, end):
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    default = default_partition(table)
+    if table_exists(cursor, default):
+        # Blocks inserts into the default partition until the move commits.
+        cursor.execute(f'LOCK TABLE "{default}" IN SHARE ROW EXCLUSIVE MODE')
+        cursor.execute(
+            f'SELECT 1 FROM "{default}" WHERE "created_at" >= %s AND "created_at" < %s LIMIT 1',
+            [start, end],
+        )
+        if cursor.fetchone() is not None:
+            cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM "{default}" WHERE "created_at" >= %s AND "created_at" < %s RETURNING *) '
+                f'INSERT INTO "{name}" SELECT * FROM moved',
+                [start, end],
+            )
+            cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {bounds}')
+            if table == 'Order' and table_exists(cursor, REGISTRY):
+                # Deleting from the default partition unregistered the ids.
+                cursor.execute(
+                    f'INSERT INTO "{REGISTRY}" ("id", "created_at") SELECT "id", "created_at" FROM "{name}" '
+                    'ON CONFLICT DO NOTHING'
+                )
+            return
+    cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}')
+
+
+def old_partitions(retain_months, now=None):
+    """Partitions whose whole range is older than retain_months months."""
+    cutoff = add_months(period_start(now or datetime.now(timezone.utc), 1), -retain_months)
+    months = get_interval()
+    return [
+        (table, name)
+        for table in TABLES
+        for name, start in list_partitions(table)
+        if add_months(start, months) <= cutoff
+    ]
+
+
+def detach_partitions(partitions, archive_schema=None, drop=False):
+    """
+    Detach partitions from their tables. Detached partitions keep their rows
+    as standalone tables, optionally moved to archive_schema, or are dropped.
+    Dropped orders leave the OrderId registry; order items must be dropped
+    with them, or the registry's foreign keys fail the transaction.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if archive_schema and not drop:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+        for table, name in partitions:
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if drop:
+                if table == 'Order' and table_exists(cursor, REGISTRY):
+                    cursor.execute(f'DELETE FROM "{REGISTRY}" WHERE "id" IN (SELECT "id" FROM "{name}")')
+                cursor.execute(f'DROP TABLE "{name}"')
+            elif archive_schema:
+                cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
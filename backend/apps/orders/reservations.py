@@ -0,0 +1,104 @@
+"""
+Stock reservations held while a buyer pays.
+
+Reserving takes the units out of stock straight away, so a paying buyer can
+never be oversold; checkout then claims the reservation instead of taking
+stock again. Reservations that are not claimed in time are released.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from apps.products.inventory import InsufficientStock, decrement_stock, increment_stock
+
+from .models import StockReservation
+
+User = get_user_model()
+
+
+class ReservationExpired(Exception):
+    """Raised when a reservation was released before checkout claimed it."""
+
+
+class TooManyReservations(Exception):
+    """The user already holds STOCK_RESERVATION_MAX_PER_USER active reservations."""
+
+
+def get_max_reservations():
+    return getattr(settings, 'STOCK_RESERVATION_MAX_PER_USER', 3)
+
+
+def take_stock(quantities):
+    """
+    Decrement stock, releasing expired reservations and retrying once if
+    they might be what is holding the missing units.
+    """
+    try:
+        decrement_stock(quantities)
+    except InsufficientStock:
+        if not release_expired_reservations():
+            raise
+        decrement_stock(quantities)
+
+
+def reserve_stock(user, quantities, from_cart=False):
+    """
+    Take quantities out of stock and hold them for user. Raises
+    TooManyReservations so one account cannot hold the whole stock.
+    """
+    ttl = getattr(settings, 'STOCK_RESERVATION_TTL', 900)
+    with transaction.atomic():
+        # Lock the user's row so concurrent requests are counted one by one.
+        User.objects.select_for_update().filter(pk=user.pk).values_list('pk').get()
+        active = StockReservation.objects.filter(user=user, expires_at__gt=timezone.now()).count()
+        if active >= get_max_reservations():
+            raise TooManyReservations(active)
+        take_stock(quantities)
+        return StockReservation.objects.create(
+            user=user,
+            items=dict(quantities),
+            from_cart=from_cart,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+        )
+
+
+def claim_reservation(reservation):
+    """
+    Consume a reservation inside the checkout transaction.
+    The conditional DELETE races safely with release_expired_reservations():
+    exactly one of them removes the row.
+    """
+    claimed, _ = StockReservation.objects.filter(pk=reservation.pk, expires_at__gt=timezone.now()).delete()
+    if not claimed:
+        raise ReservationExpired(reservation.pk)
+
+
+def release_expired_reservations(now=None, batch_size=500):
+    """Return the stock of expired reservations. Returns the number released."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects
+                .select_for_update(skip_locked=True)
+                .filter(expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('pk', 'items')[:batch_size]
+            )
+            if not batch:
+                return released
+            deleted, _ = StockReservation.objects.filter(pk__in=[pk for pk, _ in batch], expires_at__lte=now).delete()
+            if deleted != len(batch):
+                # Lost a race with checkout; try again with fresh rows.
+                transaction.set_rollback(True)
+                continue
+            quantities = Counter()
+            for _, items in batch:
+                quantities.update(items)
+            increment_stock(quantities)
+            released += len(batch)
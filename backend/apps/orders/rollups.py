@@ -0,0 +1,229 @@
+"""
+Incrementally maintained daily sales rollups (DailyStoreSales).
+
+Every order change is turned into per-(store, day) deltas that are applied
+with F() updates, so dashboards read one row per store and day instead of
+scanning orders. Platform-wide totals are summed from the store rows when
+read: a shared per-day row would be locked by every checkout until it
+commits. rebuild_sales_rollups() recomputes everything from history.
+"""
+import functools
+import operator
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Now, TruncDate
+from django.utils import timezone
+
+from .models import DailyStoreSales, Order, OrderItem
+
+ROLLUP_FIELDS = (
+    'order_count', 'revenue', 'items_sold',
+    'paid_order_count', 'paid_revenue', 'cod_order_count', 'cod_revenue',
+    'placed_order_count', 'processing_order_count', 'shipped_order_count', 'delivered_order_count',
+)
+
+# Rollup column counting the orders currently in each status.
+STATUS_FIELDS = {
+    Order.OrderStatus.ORDER_PLACED: 'placed_order_count',
+    Order.OrderStatus.PROCESSING: 'processing_order_count',
+    Order.OrderStatus.SHIPPED: 'shipped_order_count',
+    Order.OrderStatus.DELIVERED: 'delivered_order_count',
+}
+
+
+def rollup_date(created_at):
+    return timezone.localdate(created_at)
+
+
+def order_contribution(total, is_paid, payment_method, status):
+    """What one order adds to its day's rollup."""
+    is_cod = payment_method == Order.PaymentMethod.COD
+    return Counter({
+        'order_count': 1,
+        'revenue': total,
+        'paid_order_count': int(is_paid),
+        'paid_revenue': total if is_paid else Decimal('0'),
+        'cod_order_count': int(is_cod),
+        'cod_revenue': total if is_cod else Decimal('0'),
+        STATUS_FIELDS[status]: 1,
+    })
+
+
+class RollupDeltas:
+    """Accumulates deltas per (store_id, date) before applying them in bulk."""
+
+    def __init__(self):
+        self.deltas = defaultdict(Counter)
+
+    def add(self, store_id, created_at, changes, sign=1):
+        key = (store_id, rollup_date(created_at))
+        for field, value in changes.items():
+            self.deltas[key][field] += sign * value
+
+    def add_order(self, store_id, created_at, total, is_paid, payment_method, status, sign=1):
+        self.add(store_id, created_at, order_contribution(total, is_paid, payment_method, status), sign)
+
+    def move_status(self, store_id, created_at, old_status, new_status):
+        self.add(store_id, created_at, {STATUS_FIELDS[old_status]: -1, STATUS_FIELDS[new_status]: 1})
+
+    def add_items(self, store_id, created_at, quantity):
+        self.add(store_id, created_at, {'items_sold': quantity})
+
+    def apply(self):
+        apply_rollup_deltas(self.deltas)
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Apply {(store_id, date): Counter} to the store rollups in two queries.
+    Rows are only created for increments: decrements can arrive after the
+    store was deleted and its rows detached.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+
+    conditions = {key: Q(store_id=key[0], date=key[1]) for key in deltas}
+    updates = {}
+    for field in ROLLUP_FIELDS:
+        output_field = DailyStoreSales._meta.get_field(field)
+        whens = [
+            When(conditions[key], then=Value(delta[field], output_field=output_field))
+            for key, delta in deltas.items() if delta[field]
+        ]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0, output_field=output_field))
+
+    with transaction.atomic():
+        DailyStoreSales.objects.bulk_create(
+            [
+                DailyStoreSales(store_id=store_id, date=date)
+                for (store_id, date), delta in deltas.items() if any(v > 0 for v in delta.values())
+            ],
+            ignore_conflicts=True,
+        )
+        (
+            DailyStoreSales.objects
+            .filter(functools.reduce(operator.or_, conditions.values()))
+            .update(updated_at=Now(), **updates)
+        )
+
+
+def record_orders(orders, items):
+    """Add a batch of new orders and their items (created with bulk_create)."""
+    deltas = RollupDeltas()
+    created_at = {}
+    for order in orders:
+        deltas.add_order(
+            order.store_id, order.created_at, order.total, order.is_paid, order.payment_method, order.status,
+        )
+        created_at[order.pk] = (order.store_id, order.created_at)
+    for item in items:
+        store_id, when = created_at[item.order_id]
+        deltas.add_items(store_id, when, item.quantity)
+    deltas.apply()
+
+
+def record_order_change(old, new):
+    """
+    Move an order's contribution from old to new, both dicts of
+    Order.ROLLUP_FIELDS values; pass None for "did not exist".
+    """
+    deltas = RollupDeltas()
+    for values, sign in ((old, -1), (new, 1)):
+        if values is not None:
+            deltas.add_order(
+                values['store_id'], values['created_at'], values['total'], values['is_paid'],
+                values['payment_method'], values['status'], sign=sign,
+            )
+    deltas.apply()
+
+
+def record_status_change(store_id, created_ats, old_status, new_status):
+    """Move orders of one store, placed at created_ats, between status counts (after an update())."""
+    deltas = RollupDeltas()
+    for created_at in created_ats:
+        deltas.move_status(store_id, created_at, old_status, new_status)
+    deltas.apply()
+
+
+def rebuild_sales_rollups():
+    """
+    Recompute the store rollups from the Order and OrderItem tables.
+    Returns the number of store-day rows written. Rows of deleted stores
+    are kept, since their orders are gone. Concurrent orders may be missed,
+    so run it while traffic is low.
+    """
+    is_cod = Q(payment_method=Order.PaymentMethod.COD)
+    by_status = {
+        field: Count('id', filter=Q(status=status))
+        for status, field in STATUS_FIELDS.items()
+    }
+    orders = (
+        Order.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('store_id', 'day')
+        .annotate(
+            order_count=Count('id'),
+            revenue=Sum('total'),
+            paid_order_count=Count('id', filter=Q(is_paid=True)),
+            paid_revenue=Sum('total', filter=Q(is_paid=True)),
+            cod_order_count=Count('id', filter=is_cod),
+            cod_revenue=Sum('total', filter=is_cod),
+            **by_status,
+        )
+        .order_by()
+    )
+    items = (
+        OrderItem.objects
+        .annotate(day=TruncDate('order__created_at'))
+        .values('order__store_id', 'day')
+        .annotate(items_sold=Sum('quantity'))
+        .order_by()
+    )
+
+    rows = {}
+    for row in orders:
+        key = (row.pop('store_id'), row.pop('day'))
+        rows[key] = DailyStoreSales(store_id=key[0], date=key[1], **{k: v or 0 for k, v in row.items()})
+    for row in items:
+        key = (row['order__store_id'], row['day'])
+        if key in rows:
+            rows[key].items_sold = row['items_sold'] or 0
+
+    with transaction.atomic():
+        DailyStoreSales.objects.filter(store__isnull=False).delete()
+        DailyStoreSales.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def sales_summary(queryset, days):
+    """
+    All-time totals plus the last `days` days of a DailyStoreSales queryset
+    summed per day, one dict per day (zeros included), oldest first.
+    """
+    totals = queryset.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+    totals = {field: value or 0 for field, value in totals.items()}
+
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    stored = {
+        row['date']: row
+        for row in (
+            queryset
+            .filter(date__gte=start, date__lte=today)
+            .values('date')
+            .annotate(**{f'sum_{field}': Sum(field) for field in ROLLUP_FIELDS})
+            .order_by()
+        )
+    }
+    daily = []
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        row = stored.get(date, {})
+        daily.append({'date': date, **{field: row.get(f'sum_{field}') or 0 for field in ROLLUP_FIELDS}})
+    return totals, daily
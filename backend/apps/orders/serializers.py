@@ -0,0 +1,309 @@
+from rest_framework import serializers
+from apps.coupons.models import Coupon
+from apps.products.models import Product
+from apps.users.models import Address
+from apps.users.serializers import AddressSerializer
+from .cart import MAX_LINES, MAX_QUANTITY
+from .coupons import CouponUnavailable, check_usage_limits
+from .models import Order, OrderItem, StockReservation
+from .payments import METADATA_VALUE_LIMIT, order_ids_metadata
+
+COUPON_USED_UP = 'This coupon has reached its usage limit.'
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for OrderItem model."""
+
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ('product', 'product_name', 'quantity', 'price', 'subtotal')
+        read_only_fields = fields
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """
+    Serializer for Order model with its items.
+    Expects store, address and order_items__product to be loaded up front
+    (see prefetch_order_items), so a page costs a fixed number of queries.
+    """
+
+    items = OrderItemSerializer(source='order_items', many=True, read_only=True)
+    address = AddressSerializer(read_only=True)
+    store_name = serializers.CharField(source='store.name', read_only=True)
+    store_username = serializers.CharField(source='store.username', read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            'id', 'total', 'status', 'user', 'store', 'store_name', 'store_username', 'address',
+            'is_paid', 'payment_method', 'is_coupon_used', 'coupon', 'items',
+            'created_at', 'updated_at',
+        )
+        read_only_fields = fields
+
+
+class StoreOrderSerializer(OrderSerializer):
+    """Order serializer for sellers, with the buyer's contact details."""
+
+    buyer_name = serializers.CharField(source='user.name', read_only=True)
+    buyer_email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = OrderSerializer.Meta.fields + ('buyer_name', 'buyer_email')
+        read_only_fields = fields
+
+
+class DailySalesSerializer(serializers.Serializer):
+    """One day of a sales rollup (platform-wide or per store), from sales_summary()."""
+
+    date = serializers.DateField()
+    order_count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+    items_sold = serializers.IntegerField()
+    paid_order_count = serializers.IntegerField()
+    paid_revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+    cod_order_count = serializers.IntegerField()
+    cod_revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+    placed_order_count = serializers.IntegerField()
+    processing_order_count = serializers.IntegerField()
+    shipped_order_count = serializers.IntegerField()
+    delivered_order_count = serializers.IntegerField()
+
+
+class CouponReportSerializer(serializers.Serializer):
+    """Usage and revenue of one coupon, from coupon_report()."""
+
+    coupon = serializers.CharField()
+    checkouts = serializers.IntegerField()
+    orders = serializers.IntegerField()
+    buyers = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    discount_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class OrderStatusTransitionSerializer(serializers.Serializer):
+    """Serializer for moving many of a store's orders to a new status."""
+
+    orders = serializers.ListField(
+        child=serializers.CharField(max_length=30),
+        allow_empty=False,
+        max_length=500,
+    )
+    status = serializers.ChoiceField(choices=Order.OrderStatus.choices)
+
+    def validate_status(self, value):
+        if value not in Order.STATUS_TRANSITIONS.values():
+            raise serializers.ValidationError(f'Orders cannot be moved to {value}.')
+        return value
+
+
+class PaymentIntentSerializer(serializers.Serializer):
+    """The buyer's unpaid Stripe orders to pay for in one PaymentIntent."""
+
+    orders = serializers.ListField(
+        child=serializers.CharField(max_length=30),
+        allow_empty=False,
+        max_length=50,
+    )
+
+    def validate_orders(self, value):
+        user = self.context['request'].user
+        order_ids = set(value)
+        orders = list(Order.objects.filter(pk__in=order_ids, user=user))
+        missing = sorted(order_ids - {order.pk for order in orders})
+        if missing:
+            raise serializers.ValidationError(f'Orders not found: {", ".join(missing)}.')
+        unpayable = sorted(
+            order.pk for order in orders
+            if order.is_paid or order.payment_method != Order.PaymentMethod.STRIPE
+        )
+        if unpayable:
+            raise serializers.ValidationError(f'Orders not awaiting a Stripe payment: {", ".join(unpayable)}.')
+        if len(order_ids_metadata(order_ids)) > METADATA_VALUE_LIMIT:
+            raise serializers.ValidationError('Too many orders for one payment.')
+        return orders
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    product = serializers.CharField(max_length=30)
+    quantity = serializers.IntegerField(min_value=1, max_value=1000)
+
+
+class CartItemsSerializer(serializers.Serializer):
+    """
+    Resolves the items being bought.
+    items defaults to the user's saved cart ({product_id: quantity}).
+    """
+
+    items = CheckoutItemSerializer(many=True, required=False, write_only=True)
+
+    def get_entries(self, attrs):
+        """Return (entries, from_cart) where entries is a list of (product_id, quantity)."""
+        if 'items' in attrs:
+            return [(item['product'], item['quantity']) for item in attrs['items']], False
+        user = self.context['request'].user
+        return list((user.cart or {}).items()), True
+
+    def validate(self, attrs):
+        entries, attrs['from_cart'] = self.get_entries(attrs)
+
+        # Merge duplicate lines: an order has one row per product.
+        quantities = {}
+        for product_id, quantity in entries:
+            if not isinstance(quantity, int) or quantity < 1:
+                raise serializers.ValidationError({'items': f'Invalid quantity for product {product_id}.'})
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        if not quantities:
+            raise serializers.ValidationError({'items': 'Cart is empty.'})
+
+        # All prices in one IN query.
+        products = Product.objects.select_related('store').in_bulk(list(quantities))
+        missing = sorted(set(quantities) - set(products))
+        if missing:
+            raise serializers.ValidationError({'items': f'Products not found: {", ".join(missing)}.'})
+        unavailable = sorted(
+            pk for pk, product in products.items()
+            if not self.is_available(product)
+        )
+        if unavailable:
+            raise serializers.ValidationError({'items': f'Products not available: {", ".join(unavailable)}.'})
+
+        attrs['quantities'] = quantities
+        attrs['products'] = products
+        return attrs
+
+    def is_available(self, product):
+        # Tracked stock is checked atomically when it is taken.
+        return (product.in_stock or product.stock is not None) and product.store.is_active
+
+
+class ReservationSerializer(CartItemsSerializer):
+    """Serializer for reserving stock while the buyer pays."""
+
+    id = serializers.CharField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['items'] = instance.items
+        return data
+
+
+class CheckoutSerializer(CartItemsSerializer):
+    """
+    Serializer for checkout.
+    Pass a reservation instead of items to buy stock reserved earlier.
+    """
+
+    address = serializers.CharField(max_length=30)
+    payment_method = serializers.ChoiceField(choices=Order.PaymentMethod.choices)
+    reservation = serializers.CharField(max_length=30, required=False)
+    coupon_code = serializers.CharField(max_length=50, required=False, allow_blank=True)
+
+    def validate_address(self, value):
+        user = self.context['request'].user
+        try:
+            return Address.objects.get(pk=value, user=user)
+        except Address.DoesNotExist:
+            raise serializers.ValidationError('Address not found.')
+
+    def validate_reservation(self, value):
+        user = self.context['request'].user
+        try:
+            return StockReservation.objects.get(pk=value, user=user)
+        except StockReservation.DoesNotExist:
+            raise serializers.ValidationError('Reservation not found or expired.')
+
+    def get_entries(self, attrs):
+        reservation = attrs.get('reservation')
+        if reservation is None:
+            return super().get_entries(attrs)
+        if 'items' in attrs:
+            raise serializers.ValidationError({'items': 'Cannot be combined with a reservation.'})
+        return list(reservation.items.items()), reservation.from_cart
+
+    def is_available(self, product):
+        # Reserved units are already out of stock, possibly the last ones.
+        if self.initial_data.get('reservation'):
+            return product.store.is_active
+        return super().is_available(product)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        user = self.context['request'].user
+
+        code = attrs.get('coupon_code')
+        attrs['coupon'] = None
+        if code:
+            coupon = Coupon.objects.filter(code=code.upper()).first()
+            is_new_user = not Order.objects.filter(user=user).exists()
+            if coupon is None or not coupon.is_applicable_for_user(user, is_new_user=is_new_user):
+                raise serializers.ValidationError({'coupon_code': 'Invalid or expired coupon.'})
+            # Checked again under a lock when the orders are placed.
+            try:
+                check_usage_limits(coupon, user, coupon.max_uses, coupon.max_uses_per_user)
+            except CouponUnavailable:
+                raise serializers.ValidationError({'coupon_code': COUPON_USED_UP})
+            attrs['coupon'] = coupon
+
+        return attrs
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """One cart change; quantity defaults to 1 for add and remove."""
+
+    OPERATIONS = ('add', 'remove', 'set', 'delete', 'clear')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    product = serializers.CharField(max_length=30, required=False)
+    quantity = serializers.IntegerField(min_value=0, max_value=MAX_QUANTITY, default=1)
+
+    def validate(self, attrs):
+        if attrs['op'] != 'clear' and not attrs.get('product'):
+            raise serializers.ValidationError({'product': 'This field is required.'})
+        if attrs['op'] in ('add', 'remove') and attrs['quantity'] < 1:
+            raise serializers.ValidationError({'quantity': 'Ensure this value is greater than or equal to 1.'})
+        return attrs
+
+
+class CartUpdateSerializer(serializers.Serializer):
+    """A batch of cart operations, applied in order and atomically."""
+
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=MAX_LINES)
+
+    def validate_operations(self, value):
+        # Only products being added must exist; stale ones can always be removed.
+        added = {op['product'] for op in value if op['op'] in ('add', 'set') and op['quantity']}
+        if added:
+            found = set(Product.objects.filter(pk__in=added).values_list('pk', flat=True))
+            missing = sorted(added - found)
+            if missing:
+                raise serializers.ValidationError(f'Products not found: {", ".join(missing)}.')
+        return value
+
+
+class CartLineSerializer(serializers.Serializer):
+    product = serializers.CharField()
+    name = serializers.CharField()
+    image = serializers.CharField(allow_null=True)
+    mrp = serializers.DecimalField(max_digits=10, decimal_places=2)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    quantity = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    stock = serializers.IntegerField(allow_null=True)
+    store = serializers.CharField()
+    store_name = serializers.CharField()
+    store_username = serializers.CharField()
+    available = serializers.BooleanField()
+
+
+class PricedCartSerializer(serializers.Serializer):
+    """The cart with current prices and availability, from priced_cart()."""
+
+    items = CartLineSerializer(many=True)
+    quantity = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=14, decimal_places=2)
+    missing = serializers.ListField(child=serializers.CharField())
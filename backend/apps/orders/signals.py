@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.products.rankings import record_sales
+
+from .models import Order, OrderItem
+from .rollups import RollupDeltas, record_order_change
+
+
+def _rollup_values(order):
+    return {name: getattr(order, name) for name in Order.ROLLUP_FIELDS}
+
+
+def _order_store_and_date(item):
+    """(store_id, created_at) of the item's order, without reloading a cached order."""
+    order = item._state.fields_cache.get('order')
+    if order is not None:
+        return order.store_id, order.created_at
+    return Order.objects.filter(pk=item.order_id).values_list('store_id', 'created_at').first()
+
+
+@receiver(post_save, sender=OrderItem)
+def add_item_to_rankings(sender, instance, created, **kwargs):
+    if created:
+        record_sales({instance.product_id: instance.quantity})
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_from_rankings(sender, instance, **kwargs):
+    record_sales({instance.product_id: -instance.quantity})
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollups_on_save(sender, instance, created, **kwargs):
+    if created:
+        record_order_change(None, _rollup_values(instance))
+        return
+    old = getattr(instance, '_loaded_rollup', None)
+    if old is None:
+        # Instance was not loaded from the database; nothing to diff against.
+        return
+    record_order_change(old, _rollup_values(instance))
+
+
+@receiver(post_delete, sender=Order)
+def update_sales_rollups_on_delete(sender, instance, **kwargs):
+    record_order_change(getattr(instance, '_loaded_rollup', None) or _rollup_values(instance), None)
+
+
+@receiver(post_save, sender=OrderItem)
+def add_item_to_sales_rollups(sender, instance, created, **kwargs):
+    if created:
+        _apply_items(instance, instance.quantity)
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_from_sales_rollups(sender, instance, **kwargs):
+    _apply_items(instance, -instance.quantity)
+
+
+def _apply_items(item, quantity):
+    order = _order_store_and_date(item)
+    if order is None:
+        return
+    deltas = RollupDeltas()
+    deltas.add_items(*order, quantity)
+    deltas.apply()
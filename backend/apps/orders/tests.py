@@ -0,0 +1,194 @@
+import threading
+import unittest
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+
+from apps.products.inventory import InsufficientStock
+from apps.products.models import Product
+from apps.stores.models import Store
+from apps.users.models import Address
+
+from .checkout import place_orders
+from .export import escape_formula
+from .models import Order, OrderItem
+
+User = get_user_model()
+
+
+class OrderHistoryQueryCountTests(APITestCase):
+    """Order history endpoints run a fixed number of queries per page."""
+
+    ITEMS_PER_ORDER = 5
+
+    expected_queries = {
+        # Orders page, then all of its items with product names.
+        '/api/orders/': 2,
+        # Same, after loading the seller's store for IsSeller.
+        '/api/orders/store/': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user(email='buyer@example.com', name='Buyer', password='pw12345678')
+        cls.seller = User.objects.create_user(email='seller@example.com', name='Seller', password='pw12345678')
+        cls.store = Store.objects.create(
+            user=cls.seller, name='Shop', description='Shop', username='shop', address='Street 1',
+            logo='https://example.com/logo.png', email='seller@example.com', contact='123',
+            status='approved', is_active=True,
+        )
+        cls.address = Address.objects.create(
+            user=cls.buyer, name='Buyer', email='buyer@example.com', street='Street 1', city='City',
+            state='State', zip='12345', country='Country', phone='123',
+        )
+        cls.products = [
+            Product.objects.create(
+                name=f'Product {i}', description='Product', mrp=Decimal('10.00'), price=Decimal('8.00'),
+                category='Tests', store=cls.store,
+            )
+            for i in range(cls.ITEMS_PER_ORDER)
+        ]
+
+    def place_orders(self, count, items_per_order):
+        orders = []
+        for _ in range(count):
+            order = Order.objects.create(
+                total=Decimal('8.00') * items_per_order, user=self.buyer, store=self.store,
+                address=self.address, payment_method=Order.PaymentMethod.COD,
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price=product.price, created_at=order.created_at)
+                for product in self.products[:items_per_order]
+            ])
+            orders.append(order)
+        return orders
+
+    def count_queries(self, user, url):
+        # A fresh user each time, so nothing is cached on the instance.
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        with self.assertNumQueries(self.expected_queries[urlsplit(url).path]):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_buyer_list_is_constant(self):
+        self.place_orders(1, 1)
+        response = self.count_queries(self.buyer, '/api/orders/')
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.place_orders(19, self.ITEMS_PER_ORDER)
+        response = self.count_queries(self.buyer, '/api/orders/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(len(response.data['results'][0]['items']), self.ITEMS_PER_ORDER)
+
+    def test_store_list_is_constant(self):
+        self.place_orders(1, 1)
+        response = self.count_queries(self.seller, '/api/orders/store/')
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.place_orders(19, self.ITEMS_PER_ORDER)
+        response = self.count_queries(self.seller, '/api/orders/store/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(len(response.data['results'][0]['items']), self.ITEMS_PER_ORDER)
+
+    def test_deep_pages_are_constant(self):
+        self.place_orders(30, self.ITEMS_PER_ORDER)
+        response = self.count_queries(self.buyer, '/api/orders/?page_size=10')
+        self.count_queries(self.buyer, response.data['next'])
+
+    def test_retrieve_is_constant(self):
+        small, = self.place_orders(1, 1)
+        large, = self.place_orders(1, self.ITEMS_PER_ORDER)
+        for order, items in ((small, 1), (large, self.ITEMS_PER_ORDER)):
+            self.client.force_authenticate(User.objects.get(pk=self.buyer.pk))
+            # The order with its store and address, then its items.
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/orders/{order.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['items']), items)
+
+
+class ExportFormulaTests(SimpleTestCase):
+    """Exported text never starts like a spreadsheet formula."""
+
+    def test_formula_prefixes_are_quoted(self):
+        for value in ('=1+1', '+cmd', '-1', '@SUM(A1)', '\tx', '\rx'):
+            self.assertEqual(escape_formula(value), "'" + value)
+
+    def test_other_values_are_unchanged(self):
+        for value in ('Alice', 'a=b', '', Decimal('-1.00'), 3, None):
+            self.assertEqual(escape_formula(value), value)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Needs concurrent writers (PostgreSQL).')
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """Simultaneous checkouts of one product never oversell its stock."""
+
+    CHECKOUTS = 300
+    STOCK = 50
+    # Each thread holds a database connection; stay well below max_connections.
+    THREADS = 50
+
+    def setUp(self):
+        seller = User.objects.create_user(email='seller@example.com', name='Seller', password=None)
+        self.buyer = User.objects.create_user(email='buyer@example.com', name='Buyer', password=None)
+        store = Store.objects.create(
+            user=seller, name='Shop', description='Shop', username='shop', address='Street 1',
+            logo='https://example.com/logo.png', email='seller@example.com', contact='123',
+            status='approved', is_active=True,
+        )
+        self.address = Address.objects.create(
+            user=self.buyer, name='Buyer', email='buyer@example.com', street='Street 1', city='City',
+            state='State', zip='12345', country='Country', phone='123',
+        )
+        product = Product.objects.create(
+            name='Product', description='Product', mrp=Decimal('10.00'), price=Decimal('8.00'),
+            category='Tests', store=store, stock=self.STOCK,
+        )
+        self.product = Product.objects.select_related('store').get(pk=product.pk)
+
+    def test_stock_is_never_oversold(self):
+        results = {'placed': 0, 'sold_out': 0, 'errors': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+        remaining = iter(range(self.CHECKOUTS))
+
+        def worker():
+            try:
+                barrier.wait()
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    try:
+                        place_orders(
+                            self.buyer, self.address, Order.PaymentMethod.COD,
+                            {self.product.pk: 1}, {self.product.pk: self.product},
+                        )
+                        outcome = 'placed'
+                    except InsufficientStock:
+                        outcome = 'sold_out'
+                    except DatabaseError:
+                        outcome = 'errors'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        self.assertEqual(results, {'placed': self.STOCK, 'sold_out': self.CHECKOUTS - self.STOCK, 'errors': 0})
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(OrderItem.objects.aggregate(total=Sum('quantity'))['total'], self.STOCK)
+        self.assertEqual(self.product.stock, 0)
+        self.assertFalse(self.product.in_stock)
@@ -0,0 +1,84 @@
+"""
+Bulk order status transitions for sellers.
+
+A batch is validated with one locking SELECT, applied with one filtered
+UPDATE and audited with one bulk INSERT, however many orders it contains.
+The sales rollups' status counts move in the same transaction.
+"""
+from django.db import transaction
+from django.db.models.functions import Now
+
+from .models import Order, OrderStatusHistory
+from .rollups import record_status_change
+
+
+class TransitionConflict(Exception):
+    """Raised when orders change status while a batch is being applied."""
+
+
+def previous_status(status):
+    """The only status an order can move to status from, or None."""
+    for source, target in Order.STATUS_TRANSITIONS.items():
+        if target == status:
+            return source
+    return None
+
+
+def bulk_transition(store, order_ids, status, user=None):
+    """
+    Move the store's orders to status.
+    Returns (updated_count, results) where results has one
+    {'id', 'result', 'detail'} entry per distinct order id, in input order.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    source = previous_status(status)
+
+    with transaction.atomic():
+        current = {}
+        created_at = {}
+        for pk, order_status, placed_at in (
+            Order.objects
+            .select_for_update()
+            .filter(store=store, pk__in=order_ids)
+            .order_by('pk')
+            .values_list('pk', 'status', 'created_at')
+        ):
+            current[pk] = order_status
+            created_at[pk] = placed_at
+
+        results = {}
+        movable = []
+        for order_id in order_ids:
+            if order_id not in current:
+                results[order_id] = ('not_found', 'Order not found.')
+            elif current[order_id] == status:
+                results[order_id] = ('unchanged', f'Order is already {status}.')
+            elif current[order_id] != source:
+                results[order_id] = ('invalid', f'Cannot move an order from {current[order_id]} to {status}.')
+            else:
+                movable.append(order_id)
+                results[order_id] = ('updated', None)
+
+        updated = 0
+        if movable:
+            # The status condition repeats the check, so nothing is moved
+            # twice even where row locks are not supported.
+            updated = (
+                Order.objects
+                .filter(store=store, pk__in=movable, status=source)
+                .update(status=status, updated_at=Now())
+            )
+            if updated != len(movable):
+                # Someone else moved some of them; roll back and let the caller retry.
+                raise TransitionConflict()
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(order_id=order_id, from_status=source, to_status=status, changed_by=user)
+                for order_id in movable
+            ])
+            # update() sends no signals: move the status counts here.
+            record_status_change(store.pk, [created_at[order_id] for order_id in movable], source, status)
+
+    return updated, [
+        {'id': order_id, 'result': results[order_id][0], 'detail': results[order_id][1]}
+        for order_id in order_ids
+    ]
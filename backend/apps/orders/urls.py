@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import OrderViewSet
+from .views import CartView, OrderViewSet, StripeWebhookView
 
 app_name = 'orders'
 
@@ -8,5 +8,7 @@ router = DefaultRouter()
 router.register(r'', OrderViewSet, basename='order')
 
 urlpatterns = [
+    path('cart/', CartView.as_view(), name='cart'),
+    path('stripe/webhook/', StripeWebhookView.as_view(), name='stripe-webhook'),
     path('', include(router.urls)),
 ]
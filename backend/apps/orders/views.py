@@ -0,0 +1,339 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Prefetch, Sum, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import mixins, permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.products.inventory import InsufficientStock
+from apps.products.models import CategoryFacet
+from apps.products.permissions import IsSeller
+from apps.stores.models import Store
+
+from .cart import CartFull, apply_cart_operations, priced_cart
+from .checkout import place_orders
+from .coupons import CouponUnavailable, coupon_report
+from .export import export_orders_csv
+from .idempotency import idempotent
+from .models import CouponRedemption, DailyStoreSales, Order, OrderItem
+from .pagination import OrderCursorPagination
+from .payments import InvalidEvent, PaymentUnavailable, create_payment_intent, enqueue_event, parse_event
+from .reservations import ReservationExpired, TooManyReservations, reserve_stock
+from .rollups import sales_summary
+from .serializers import (
+    COUPON_USED_UP,
+    CartUpdateSerializer,
+    CheckoutSerializer,
+    CouponReportSerializer,
+    DailySalesSerializer,
+    OrderSerializer,
+    OrderStatusTransitionSerializer,
+    PaymentIntentSerializer,
+    PricedCartSerializer,
+    ReservationSerializer,
+    StoreOrderSerializer,
+)
+from .transitions import TransitionConflict, bulk_transition
+
+
+def prefetch_order_items(orders):
+    """
+    Load the items (and product names) of orders in one query. Bounding it
+    by the orders' created_at range lets PostgreSQL skip the OrderItem
+    partitions outside it.
+    """
+    if not orders:
+        return
+    created = [order.created_at for order in orders]
+    items = (
+        OrderItem.objects
+        .filter(created_at__range=(min(created), max(created)))
+        .select_related('product')
+        .only('id', 'order_id', 'quantity', 'price', 'created_at', 'product__id', 'product__name')
+    )
+    prefetch_related_objects(orders, Prefetch('order_items', queryset=items))
+
+
+class OrderViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoints for orders.
+    GET /api/orders/ - The buyer's order history, newest first
+    GET /api/orders/{id}/ - One of the buyer's orders
+    GET /api/orders/store/ - Orders received by the seller's store
+    GET /api/orders/stats/ - Platform dashboard totals and daily sales (admin)
+    GET /api/orders/store/stats/ - Store dashboard totals and daily sales (seller)
+    GET /api/orders/store/export/ - Streamed CSV of the store's order items (seller)
+    GET /api/orders/coupons/ - Usage and revenue per coupon (admin)
+    POST /api/orders/store/status/ - Move many store orders to a new status (seller)
+    POST /api/orders/ - Checkout: place one order per store in the cart
+    POST /api/orders/reservations/ - Reserve stock while paying
+    POST /api/orders/payment-intent/ - Start a Stripe payment for unpaid Stripe orders
+    Lists accept ?status= and ?since=YYYY-MM-DD (which limits PostgreSQL to the
+    recent partitions) and page with ?cursor=. POSTs honour Idempotency-Key.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
+    max_stats_days = 366
+
+    def get_queryset(self):
+        if self.action == 'store':
+            queryset = Order.objects.filter(store=self.request.user.store).select_related('user')
+        else:
+            queryset = Order.objects.filter(user=self.request.user)
+
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter.upper())
+
+        since = self.get_day('since')
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+
+        # Items are loaded per page by prefetch_order_items().
+        return queryset.select_related('store', 'address')
+
+    def get_day(self, name, days=0):
+        """
+        Return the start of the YYYY-MM-DD day in query param name (shifted
+        by days) as an aware datetime, or None if it is not given.
+        """
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        day = parse_date(value) if len(value) == 10 else None
+        if day is None:
+            raise serializers.ValidationError({name: 'Use the YYYY-MM-DD format.'})
+        return timezone.make_aware(datetime.combine(day + timedelta(days=days), time.min))
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        prefetch_order_items(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        order = self.get_object()
+        prefetch_order_items([order])
+        return Response(self.get_serializer(order).data)
+
+    def get_permissions(self):
+        if self.action in ('store', 'store_stats', 'store_status', 'store_export'):
+            return [permissions.IsAuthenticated(), IsSeller()]
+        if self.action in ('stats', 'coupons'):
+            return [permissions.IsAdminUser()]
+        return super().get_permissions()
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return CheckoutSerializer
+        if self.action == 'reserve':
+            return ReservationSerializer
+        if self.action == 'payment_intent':
+            return PaymentIntentSerializer
+        if self.action == 'store':
+            return StoreOrderSerializer
+        if self.action == 'store_status':
+            return OrderStatusTransitionSerializer
+        return OrderSerializer
+
+    @action(detail=False, methods=['get'])
+    def store(self, request):
+        return self.list(request)
+
+    @action(detail=False, methods=['get'], url_path='store/export')
+    def store_export(self, request):
+        """
+        ?since=/?until= (YYYY-MM-DD, inclusive) and ?status= filter the rows.
+        The file is streamed, so memory use does not grow with the export size.
+        """
+        status_filter = request.query_params.get('status', '').upper()
+        if status_filter and status_filter not in Order.OrderStatus.values:
+            raise serializers.ValidationError({'status': f'Must be one of: {", ".join(Order.OrderStatus.values)}.'})
+
+        store = request.user.store
+        rows = export_orders_csv(
+            store,
+            start=self.get_day('since'),
+            end=self.get_day('until', days=1),
+            status=status_filter or None,
+        )
+        response = StreamingHttpResponse(rows, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{store.username}-orders.csv"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='store/status')
+    def store_status(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            updated, results = bulk_transition(
+                request.user.store,
+                serializer.validated_data['orders'],
+                serializer.validated_data['status'],
+                user=request.user,
+            )
+        except TransitionConflict:
+            return Response(
+                {'detail': 'Some orders changed while updating; please retry.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({'updated': updated, 'results': results})
+
+    def get_stats_days(self):
+        try:
+            days = int(self.request.query_params.get('days', 30))
+        except ValueError:
+            raise serializers.ValidationError({'days': 'A valid integer is required.'})
+        return min(max(days, 1), self.max_stats_days)
+
+    def stats_response(self, queryset, **counts):
+        totals, daily = sales_summary(queryset, self.get_stats_days())
+        return Response({
+            'orders': totals['order_count'],
+            'revenue': str(Decimal(totals['revenue']).quantize(Decimal('0.01'))),
+            'items_sold': totals['items_sold'],
+            **counts,
+            'daily': DailySalesSerializer(daily, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Reads the rollup tables only; ?days= sets the chart range (default 30)."""
+        return self.stats_response(
+            DailyStoreSales.objects.all(),
+            products=CategoryFacet.objects.aggregate(total=Sum('product_count'))['total'] or 0,
+            stores=Store.objects.filter(status='approved', is_active=True).count(),
+        )
+
+    @action(detail=False, methods=['get'])
+    def coupons(self, request):
+        """Reads the CouponRedemption table only; ?code= limits it to one coupon."""
+        redemptions = CouponRedemption.objects.all()
+        code = request.query_params.get('code')
+        if code:
+            redemptions = redemptions.filter(coupon=code.upper())
+        return Response(CouponReportSerializer(coupon_report(redemptions), many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='store/stats')
+    def store_stats(self, request):
+        store = request.user.store
+        return self.stats_response(
+            DailyStoreSales.objects.filter(store=store),
+            products=store.products.count(),
+        )
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            orders = place_orders(
+                user=request.user,
+                address=data['address'],
+                payment_method=data['payment_method'],
+                quantities=data['quantities'],
+                products=data['products'],
+                coupon=data['coupon'],
+                reservation=data.get('reservation'),
+                clear_cart=data['from_cart'],
+            )
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'items': f'Not enough stock for: {", ".join(exc.product_ids)}.'})
+        except ReservationExpired:
+            raise serializers.ValidationError({'reservation': 'Reservation not found or expired.'})
+        except CouponUnavailable:
+            raise serializers.ValidationError({'coupon_code': COUPON_USED_UP})
+        prefetch_related_objects(orders, 'store')
+        prefetch_order_items(orders)
+
+        return Response(OrderSerializer(orders, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='reservations')
+    @idempotent
+    def reserve(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            reservation = reserve_stock(request.user, data['quantities'], from_cart=data['from_cart'])
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'items': f'Not enough stock for: {", ".join(exc.product_ids)}.'})
+        except TooManyReservations:
+            raise serializers.ValidationError({
+                'non_field_errors': 'You already have the maximum number of active reservations. '
+                                    'Check out or wait for one to expire.'
+            })
+
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='payment-intent')
+    def payment_intent(self, request):
+        """
+        Create the PaymentIntent the client confirms with Stripe.js. The
+        webhook marks the orders paid through its order_ids metadata.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            intent = create_payment_intent(serializer.validated_data['orders'])
+        except PaymentUnavailable as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({
+            'id': intent.id,
+            'client_secret': intent.client_secret,
+            'amount': intent.amount,
+            'currency': intent.currency,
+        }, status=status.HTTP_201_CREATED)
+
+
+class CartView(APIView):
+    """
+    API endpoint for the buyer's saved cart.
+    GET /api/orders/cart/ - The cart with current prices and stock (one query)
+    PATCH /api/orders/cart/ - Apply {"operations": [{"op", "product", "quantity"}]}
+    Operations are add, remove, set (quantity 0 removes), delete and clear;
+    they are applied atomically, so concurrent changes are never lost.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        return Response(PricedCartSerializer(priced_cart(request.user.cart or {})).data)
+
+    def patch(self, request):
+        serializer = CartUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            cart = apply_cart_operations(request.user, serializer.validated_data['operations'])
+        except CartFull:
+            raise serializers.ValidationError({'operations': 'The cart cannot hold more products.'})
+        return Response(PricedCartSerializer(priced_cart(cart)).data)
+
+
+class StripeWebhookView(APIView):
+    """
+    Stripe webhook endpoint.
+    POST /api/orders/stripe/webhook/
+    Only verifies the Stripe-Signature header and queues the event; run
+    process_stripe_events to apply it.
+    """
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+    throttle_classes = ()
+
+    def post(self, request):
+        try:
+            event = parse_event(request.body, request.META.get('HTTP_STRIPE_SIGNATURE', ''))
+        except InvalidEvent as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        enqueue_event(event)
+        return Response({'received': True})
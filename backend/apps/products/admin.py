@@ -1,10 +1,25 @@
+from django import forms
 from django.contrib import admin
-from .models import Product
+from .inventory import increment_stock, set_in_stock
+from .models import CategoryFacet, Product, ProductSales
+
+
+class ProductAdminForm(forms.ModelForm):
+    add_stock = forms.IntegerField(
+        required=False,
+        min_value=1,
+        help_text='Units to add to a product that tracks stock.',
+    )
+
+    class Meta:
+        model = Product
+        fields = '__all__'
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'store', 'category', 'price', 'mrp', 'in_stock', 'created_at')
+    form = ProductAdminForm
+    list_display = ('name', 'store', 'category', 'price', 'mrp', 'in_stock', 'stock', 'created_at')
     list_filter = ('category', 'in_stock', 'created_at')
     search_fields = ('name', 'description', 'store__name')
     ordering = ('-created_at',)
@@ -14,6 +29,50 @@ class ProductAdmin(admin.ModelAdmin):
         ('Product Info', {'fields': ('name', 'description', 'category', 'store')}),
         ('Pricing', {'fields': ('mrp', 'price')}),
         ('Images', {'fields': ('images',)}),
-        ('Availability', {'fields': ('in_stock',)}),
+        ('Availability', {'fields': ('in_stock', 'stock', 'add_stock')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
     )
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return self.readonly_fields
+        # Stock only changes through apps.products.inventory, so concurrent
+        # checkouts are never overwritten by a form holding an old value.
+        readonly = self.readonly_fields + ('stock',)
+        if obj.stock is not None:
+            readonly += ('in_stock',)
+        return readonly
+
+    def get_fieldsets(self, request, obj=None):
+        if obj is not None and obj.stock is not None:
+            return self.fieldsets
+        return tuple(
+            (name, {'fields': tuple(field for field in options['fields'] if field != 'add_stock')})
+            for name, options in self.fieldsets
+        )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            return
+        if obj.stock is None and 'in_stock' in form.changed_data:
+            set_in_stock(obj.pk, form.cleaned_data['in_stock'])
+        if form.cleaned_data.get('add_stock'):
+            increment_stock({obj.pk: form.cleaned_data['add_stock']})
+
+
+@admin.register(CategoryFacet)
+class CategoryFacetAdmin(admin.ModelAdmin):
+    list_display = ('category', 'product_count', 'in_stock_count', 'updated_at')
+    search_fields = ('category',)
+    ordering = ('category',)
+    readonly_fields = ('category', 'product_count', 'in_stock_count', 'updated_at')
+
+
+@admin.register(ProductSales)
+class ProductSalesAdmin(admin.ModelAdmin):
+    list_display = ('product', 'store', 'category', 'units_sold', 'updated_at')
+    list_filter = ('category',)
+    search_fields = ('product__name', 'store__name')
+    ordering = ('-units_sold',)
+    readonly_fields = ('product', 'store', 'category', 'units_sold', 'updated_at')
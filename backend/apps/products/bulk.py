@@ -0,0 +1,266 @@
+"""
+Streaming bulk import and export of a store's products.
+
+Imports read the request body line by line, validate rows in chunks and
+insert each valid chunk with a single bulk_create, so memory stays bounded
+by the chunk size regardless of the file size.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from apps.common.cache import bump_generation_on_commit
+
+from .facets import adjust_category_facet
+from .models import Product
+from .search import get_search_backend
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+EXPORT_FIELDS = ('id', 'name', 'description', 'mrp', 'price', 'category', 'images', 'in_stock', 'stock', 'created_at')
+IMAGE_SEPARATOR = '|'
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', ''}  # blank keeps the default
+FALSE_VALUES = {'0', 'false', 'no', 'n'}
+
+
+class InvalidEncoding(ValueError):
+    """A line of the uploaded file is not valid UTF-8."""
+
+    def __init__(self, line_number):
+        self.line_number = line_number
+        super().__init__(f'Line {line_number} is not valid UTF-8.')
+
+
+def iter_lines(stream):
+    """Decode a byte stream into text lines without reading it all at once."""
+    for line_number, raw in enumerate(stream, start=1):
+        if isinstance(raw, bytes):
+            try:
+                raw = raw.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                raise InvalidEncoding(line_number)
+        yield raw
+
+
+def iter_csv_rows(stream):
+    """Yield (row_number, dict) for each CSV data row, counting from 1 after the header."""
+    reader = csv.DictReader(iter_lines(stream))
+    for row_number, row in enumerate(reader, start=1):
+        # Images are a single column separated by "|".
+        images = row.get('images') or ''
+        row['images'] = [url.strip() for url in images.split(IMAGE_SEPARATOR) if url.strip()]
+        yield row_number, row
+
+
+def iter_ndjson_rows(stream):
+    """Yield (line_number, dict) for each non-blank NDJSON line."""
+    for line_number, line in enumerate(iter_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _decimal(value, field, errors):
+    try:
+        number = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError):
+        errors[field] = 'A valid number is required.'
+        return None
+    if not number.is_finite() or number < 0 or number >= Decimal('100000000'):
+        errors[field] = 'Must be between 0 and 99999999.99.'
+        return None
+    return number.quantize(Decimal('0.01'))
+
+
+def validate_row(row):
+    """
+    Validate one import row.
+    Returns (cleaned_data, errors); cleaned_data is None when errors is set.
+    """
+    if row is None:
+        return None, {'non_field_errors': 'Row is not a valid JSON object.'}
+
+    errors = {}
+    cleaned = {}
+
+    for field, max_length in (('name', 255), ('category', 255)):
+        value = str(row.get(field) or '').strip()
+        if not value:
+            errors[field] = 'This field is required.'
+        elif len(value) > max_length:
+            errors[field] = f'Ensure this field has no more than {max_length} characters.'
+        cleaned[field] = value
+
+    cleaned['description'] = str(row.get('description') or '').strip()
+
+    for field in ('mrp', 'price'):
+        if row.get(field) in (None, ''):
+            errors[field] = 'This field is required.'
+        else:
+            cleaned[field] = _decimal(row[field], field, errors)
+    if 'mrp' not in errors and 'price' not in errors and cleaned['price'] > cleaned['mrp']:
+        errors['price'] = 'Price cannot be greater than MRP.'
+
+    images = row.get('images') or []
+    if not isinstance(images, list) or not all(isinstance(url, str) for url in images):
+        errors['images'] = 'Must be a list of image URLs.'
+    cleaned['images'] = images
+
+    in_stock = row.get('in_stock', True)
+    if isinstance(in_stock, str):
+        lowered = in_stock.strip().lower()
+        if lowered in TRUE_VALUES:
+            in_stock = True
+        elif lowered in FALSE_VALUES:
+            in_stock = False
+        else:
+            errors['in_stock'] = 'Must be true or false.'
+    cleaned['in_stock'] = bool(in_stock)
+
+    # Blank stock means it is not tracked; otherwise it decides in_stock.
+    stock = row.get('stock')
+    cleaned['stock'] = None
+    if stock not in (None, ''):
+        try:
+            cleaned['stock'] = int(str(stock).strip())
+        except ValueError:
+            errors['stock'] = 'A valid integer is required.'
+        else:
+            if not 0 <= cleaned['stock'] <= 2147483647:
+                errors['stock'] = 'Must be between 0 and 2147483647.'
+            cleaned['in_stock'] = cleaned['stock'] > 0
+
+    if errors:
+        return None, errors
+    return cleaned, None
+
+
+class ImportReport:
+    """Accumulates the per-row outcome of an import."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.error = None  # set when the file could not be read to the end
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        data = {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+def _write_chunk(store, chunk):
+    products = [Product(id=Product.generate_id(), store=store, **data) for data in chunk]
+
+    with transaction.atomic():
+        Product.objects.bulk_create(products, batch_size=CHUNK_SIZE)
+
+        # bulk_create sends no signals: keep denormalized data in step here.
+        deltas = {}
+        for product in products:
+            total, in_stock = deltas.get(product.category, (0, 0))
+            deltas[product.category] = (total + 1, in_stock + product.in_stock)
+        for category, (total, in_stock) in deltas.items():
+            adjust_category_facet(category, product_delta=total, in_stock_delta=in_stock)
+
+    backend = get_search_backend()
+    if hasattr(backend, 'index_product'):
+        for product in products:
+            backend.index_product(product)
+
+    return len(products)
+
+
+def import_products(store, rows, chunk_size=CHUNK_SIZE):
+    """
+    Validate and insert rows for store.
+    rows is an iterable of (row_number, dict) pairs; returns an ImportReport.
+    Reading stops at the first line that is not valid UTF-8 (report.error);
+    rows read before it are still imported.
+    """
+    report = ImportReport()
+    chunk = []
+
+    try:
+        for row_number, row in rows:
+            cleaned, errors = validate_row(row)
+            if errors:
+                report.add_error(row_number, errors)
+                continue
+            chunk.append(cleaned)
+            if len(chunk) >= chunk_size:
+                report.created += _write_chunk(store, chunk)
+                chunk = []
+    except InvalidEncoding as exc:
+        report.error = str(exc)
+
+    if chunk:
+        report.created += _write_chunk(store, chunk)
+
+    if report.created:
+        bump_generation_on_commit('products')
+    return report
+
+
+def _export_rows(store, chunk_size):
+    queryset = (
+        Product.objects
+        .filter(store=store)
+        .order_by('created_at', 'id')
+        .values_list(*EXPORT_FIELDS)
+    )
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def export_products_csv(store, chunk_size=2000):
+    """Yield the store's products as CSV text, one line at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for values in _export_rows(store, chunk_size):
+        row = dict(zip(EXPORT_FIELDS, values))
+        row['images'] = IMAGE_SEPARATOR.join(row['images'] or [])
+        row['stock'] = '' if row['stock'] is None else row['stock']
+        row['created_at'] = row['created_at'].isoformat()
+        writer.writerow([row[field] for field in EXPORT_FIELDS])
+        yield flush()
+
+
+def export_products_ndjson(store, chunk_size=2000):
+    """Yield the store's products as NDJSON, one object per line."""
+    for values in _export_rows(store, chunk_size):
+        row = dict(zip(EXPORT_FIELDS, values))
+        row['mrp'] = str(row['mrp'])
+        row['price'] = str(row['price'])
+        row['created_at'] = row['created_at'].isoformat()
+        yield json.dumps(row) + '\n'
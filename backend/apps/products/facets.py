@@ -0,0 +1,67 @@
+"""
+Incremental maintenance of CategoryFacet product counts.
+"""
+from django.db.models import Count, F, Q
+
+from .models import CategoryFacet, Product
+
+
+def adjust_category_facet(category, product_delta=0, in_stock_delta=0):
+    """Apply count deltas to one category, creating its row if needed."""
+    if not category or not (product_delta or in_stock_delta):
+        return
+    CategoryFacet.objects.bulk_create([CategoryFacet(category=category)], ignore_conflicts=True)
+    CategoryFacet.objects.filter(category=category).update(
+        product_count=F('product_count') + product_delta,
+        in_stock_count=F('in_stock_count') + in_stock_delta,
+    )
+
+
+def apply_product_change(old_category=None, old_in_stock=False, new_category=None, new_in_stock=False):
+    """
+    Move one product's contribution from its old (category, in_stock) state
+    to the new one. Pass None as a category for "did not exist".
+    """
+    if old_category == new_category:
+        adjust_category_facet(new_category, in_stock_delta=int(bool(new_in_stock)) - int(bool(old_in_stock)))
+        return
+    adjust_category_facet(old_category, product_delta=-1, in_stock_delta=-int(bool(old_in_stock)))
+    adjust_category_facet(new_category, product_delta=1, in_stock_delta=int(bool(new_in_stock)))
+
+
+def reconcile_category_facets():
+    """
+    Rebuild CategoryFacet from the Product table.
+    Returns the number of categories whose counts were corrected.
+    """
+    actual = {
+        row['category']: (row['total'], row['in_stock'])
+        for row in Product.objects.values('category').annotate(
+            total=Count('id'),
+            in_stock=Count('id', filter=Q(in_stock=True)),
+        ).order_by()
+    }
+    stored = {
+        facet.category: facet
+        for facet in CategoryFacet.objects.all()
+    }
+
+    to_create = []
+    to_update = []
+    for category, (total, in_stock) in actual.items():
+        facet = stored.pop(category, None)
+        if facet is None:
+            to_create.append(CategoryFacet(category=category, product_count=total, in_stock_count=in_stock))
+        elif (facet.product_count, facet.in_stock_count) != (total, in_stock):
+            facet.product_count = total
+            facet.in_stock_count = in_stock
+            to_update.append(facet)
+
+    CategoryFacet.objects.bulk_create(to_create, batch_size=500)
+    CategoryFacet.objects.bulk_update(to_update, ['product_count', 'in_stock_count'], batch_size=500)
+
+    # Whatever is left has no products any more.
+    stale = [category for category, facet in stored.items() if facet.product_count or facet.in_stock_count]
+    CategoryFacet.objects.filter(category__in=list(stored)).delete()
+
+    return len(to_create) + len(to_update) + len(stale)
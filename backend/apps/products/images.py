@@ -0,0 +1,197 @@
+"""
+Product image upload pipeline.
+
+Uploads are stored once per content hash under MEDIA_ROOT:
+
+    product-images/<hash[:2]>/<hash>/original.<ext>
+    product-images/<hash[:2]>/<hash>/<width>.webp
+
+WebP derivatives are generated in a process pool started with "spawn", since
+forking a threaded gunicorn worker can deadlock the children. Because paths are derived
+from the hash alone, serializers can compute thumbnail URLs from an image URL
+without touching the database, and duplicate uploads are detected with a
+single existence check.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+IMAGE_ROOT = 'product-images'
+ORIGINAL_RE = re.compile(
+    rf'(?P<base>.*/{IMAGE_ROOT}/[0-9a-f]{{2}}/(?P<hash>[0-9a-f]{{64}})/)original\.\w+$'
+)
+
+# Canonical extension per decoded format, so the same bytes always map to the
+# same path whatever the uploaded file was called.
+FORMAT_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class InvalidImage(Exception):
+    """An upload could not be decoded or is too large to process."""
+
+
+class ImageWorkersUnavailable(Exception):
+    """The image process pool died; the upload can be retried."""
+
+
+def get_widths():
+    return tuple(getattr(settings, 'PRODUCT_IMAGE_WIDTHS', (160, 320, 640)))
+
+
+def get_executor():
+    """Return the shared process pool, or None to process inline."""
+    global _executor
+    workers = getattr(settings, 'PRODUCT_IMAGE_WORKERS', None)
+    if workers == 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _discard_executor(executor):
+    """Drop a broken pool so the next upload starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _unavailable(executor):
+    _discard_executor(executor)
+    return ImageWorkersUnavailable('Image processing is temporarily unavailable.')
+
+
+def render_derivatives(data, widths, quality=80):
+    """
+    Decode image bytes and return {width: webp_bytes}.
+    Runs in a worker process, so it must only use picklable arguments.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        derivatives = {}
+        for width in sorted(widths, reverse=True):
+            # Never upscale; derivatives wider than the original reuse its size.
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            else:
+                resized = image
+            output = io.BytesIO()
+            resized.save(output, format='WEBP', quality=quality, method=4)
+            derivatives[width] = output.getvalue()
+        return derivatives
+
+
+def _directory(content_hash):
+    return f'{IMAGE_ROOT}/{content_hash[:2]}/{content_hash}'
+
+
+def derivative_urls(image_url):
+    """
+    Return {width: url} for an image stored by this pipeline, or {} for
+    external URLs.
+    """
+    match = ORIGINAL_RE.match(image_url or '')
+    if not match:
+        return {}
+    return {width: f"{match.group('base')}{width}.webp" for width in get_widths()}
+
+
+class StoredImage:
+    def __init__(self, content_hash, original_url, created):
+        self.content_hash = content_hash
+        self.original_url = original_url
+        self.created = created
+
+    @property
+    def thumbnails(self):
+        return derivative_urls(self.original_url)
+
+
+def detect_extension(data):
+    """Return the canonical extension for image bytes, or None if unsupported."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+            return FORMAT_EXTENSIONS.get(image.format)
+    except Exception:
+        return None
+
+
+def _save(path, data):
+    # Overwrite leftovers of an interrupted run instead of getting a renamed file.
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    return default_storage.save(path, ContentFile(data))
+
+
+def process_uploads(files):
+    """
+    Store uploaded images and their derivatives, deduplicating by content.
+    files is a list of (data, extension) pairs, the extension coming from
+    detect_extension(); returns a list of StoredImage in the same order.
+    Raises InvalidImage or ImageWorkersUnavailable.
+    """
+    widths = get_widths()
+    executor = get_executor()
+
+    results = []
+    pending = {}
+    for data, extension in files:
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = f'{_directory(content_hash)}/original{extension}'
+
+        if content_hash in pending or default_storage.exists(path):
+            results.append(StoredImage(content_hash, default_storage.url(path), created=False))
+            continue
+
+        job = None
+        if executor is not None:
+            try:
+                job = executor.submit(render_derivatives, data, widths)
+            except BrokenProcessPool:
+                raise _unavailable(executor)
+        pending[content_hash] = (path, data, job)
+        results.append(StoredImage(content_hash, default_storage.url(path), created=True))
+
+    for content_hash, (path, data, job) in pending.items():
+        try:
+            derivatives = render_derivatives(data, widths) if job is None else job.result()
+        except BrokenProcessPool:
+            raise _unavailable(executor)
+        except (Image.DecompressionBombError, OSError, ValueError) as exc:
+            raise InvalidImage(f'Could not process the image: {exc}')
+        directory = _directory(content_hash)
+        for width, webp in derivatives.items():
+            _save(f'{directory}/{width}.webp', webp)
+        # The original is written last: its presence marks a complete set.
+        _save(path, data)
+
+    return results
@@ -0,0 +1,127 @@
+"""
+Concurrency-safe stock changes.
+
+Rows are locked in primary key order, so two checkouts touching the same
+products always queue behind each other instead of deadlocking, and each
+batch is applied with a single conditional UPDATE. in_stock and the category
+facets follow the stock level. Product.save() never writes stock or
+in_stock after the insert, so these functions are the only way to change
+them.
+
+The catalog cache is only invalidated when a product sells out or comes
+back in stock; cached pages may show a stock level up to
+CATALOG_CACHE_TIMEOUT old, and checkout always checks the real one.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Now
+
+from apps.common.cache import bump_generation_on_commit
+
+from .facets import adjust_category_facet
+from .models import Product
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more products do not have enough units left."""
+
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f'Insufficient stock for: {", ".join(self.product_ids)}')
+
+
+def _lock_tracked(product_ids):
+    """Lock the stock-tracked rows among product_ids, in primary key order."""
+    return list(
+        Product.objects
+        .select_for_update()
+        .filter(pk__in=list(product_ids), stock__isnull=False)
+        .order_by('pk')
+        .values_list('pk', 'stock', 'in_stock', 'category')
+    )
+
+
+def _apply(rows, deltas):
+    """
+    Add deltas ({product_id: units}) to the locked rows in one UPDATE.
+    The WHERE clause repeats the stock check, so the update is all or
+    nothing even where row locks are not supported.
+    """
+    changed = [(pk, stock, in_stock, category) for pk, stock, in_stock, category in rows if deltas.get(pk)]
+    if not changed:
+        return
+
+    delta = Case(*[When(pk=pk, then=Value(deltas[pk])) for pk, *_ in changed], default=Value(0))
+    flipped = Counter()
+    emptied, restocked = [], []
+    for pk, stock, in_stock, category in changed:
+        now_in_stock = stock + deltas[pk] > 0
+        if now_in_stock != in_stock:
+            (restocked if now_in_stock else emptied).append(pk)
+            flipped[category] += 1 if now_in_stock else -1
+
+    updated = (
+        Product.objects
+        .filter(pk__in=[pk for pk, *_ in changed], stock__gte=-delta)
+        .update(
+            stock=F('stock') + delta,
+            in_stock=Case(
+                When(pk__in=restocked, then=Value(True)),
+                When(pk__in=emptied, then=Value(False)),
+                default=F('in_stock'),
+            ),
+            updated_at=Now(),
+        )
+    )
+    if updated != len(changed):
+        raise InsufficientStock([pk for pk, *_ in changed])
+
+    # bulk updates send no signals: keep the facets in step here.
+    for category, in_stock_delta in flipped.items():
+        adjust_category_facet(category, in_stock_delta=in_stock_delta)
+    if emptied or restocked:
+        bump_generation_on_commit('products')
+
+
+def decrement_stock(quantities):
+    """
+    Take quantities ({product_id: units}) out of stock, all or nothing.
+    Products that do not track stock are left alone. Raises InsufficientStock
+    listing every product that is short; nothing is changed in that case.
+    """
+    with transaction.atomic():
+        rows = _lock_tracked(quantities)
+        short = [pk for pk, stock, *_ in rows if stock < quantities[pk]]
+        if short:
+            raise InsufficientStock(short)
+        _apply(rows, {pk: -quantity for pk, quantity in quantities.items()})
+
+
+def increment_stock(quantities):
+    """Put quantities ({product_id: units}) back into stock."""
+    with transaction.atomic():
+        _apply(_lock_tracked(quantities), dict(quantities))
+
+
+def set_in_stock(product_id, in_stock):
+    """
+    Mark a product that does not track stock as in or out of stock.
+    Returns False if nothing changed (already set, or stock is tracked).
+    """
+    with transaction.atomic():
+        category = (
+            Product.objects
+            .select_for_update()
+            .filter(pk=product_id, stock__isnull=True)
+            .exclude(in_stock=in_stock)
+            .values_list('category', flat=True)
+            .first()
+        )
+        if category is None:
+            return False
+        Product.objects.filter(pk=product_id).update(in_stock=in_stock, updated_at=Now())
+        adjust_category_facet(category, in_stock_delta=1 if in_stock else -1)
+        bump_generation_on_commit('products')
+    return True
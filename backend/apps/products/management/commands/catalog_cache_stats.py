@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.cache import get_stats, is_enabled, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Report hit/miss counters of the catalog response cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after reporting.')
+
+    def handle(self, *args, **options):
+        if not is_enabled():
+            self.stdout.write(self.style.WARNING(
+                'The catalog cache is disabled; set CACHE_BACKEND to a shared cache to enable it.'
+            ))
+            return
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = (stats['hits'] / total * 100) if total else 0.0
+        self.stdout.write(f"Hits: {stats['hits']}")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Hit ratio: {ratio:.1f}%")
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
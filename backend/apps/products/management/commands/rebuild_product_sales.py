@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.rankings import rebuild_product_sales
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the best-selling ProductSales rankings from the OrderItem table.'
+
+    def handle(self, *args, **options):
+        corrected = rebuild_product_sales()
+        self.stdout.write(self.style.SUCCESS(
+            f'Product sales rebuilt; {corrected} row(s) corrected.'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.facets import reconcile_category_facets
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the CategoryFacet counts from the Product table to correct drift.'
+
+    def handle(self, *args, **options):
+        corrected = reconcile_category_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f'Category facets reconciled; {corrected} category(ies) corrected.'
+        ))
@@ -0,0 +1,41 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEX_NAME = 'Product_search_gin_idx'
+
+
+def search_index():
+    # Must stay identical to apps.products.search.PRODUCT_SEARCH_VECTOR.
+    vector = (
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('category', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    )
+    return GinIndex(vector, name=INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    schema_editor.add_index(Product, search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    schema_editor.remove_index(Product, search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        # PostgreSQL only; other databases use the in-process inverted index.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
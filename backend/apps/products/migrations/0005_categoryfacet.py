@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:34
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_category_facets(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    CategoryFacet = apps.get_model('products', 'CategoryFacet')
+    rows = Product.objects.values('category').annotate(
+        total=Count('id'),
+        in_stock=Count('id', filter=Q(in_stock=True)),
+    ).order_by()
+    CategoryFacet.objects.bulk_create([
+        CategoryFacet(category=row['category'], product_count=row['total'], in_stock_count=row['in_stock'])
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryFacet',
+            fields=[
+                ('category', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('product_count', models.IntegerField(default=0)),
+                ('in_stock_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Category Facet',
+                'verbose_name_plural': 'Category Facets',
+                'db_table': 'CategoryFacet',
+                'ordering': ['category'],
+            },
+        ),
+        migrations.RunPython(populate_category_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_product_sales(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Product = apps.get_model('products', 'Product')
+    ProductSales = apps.get_model('products', 'ProductSales')
+    totals = dict(
+        OrderItem.objects.values('product_id').annotate(units=Sum('quantity')).values_list('product_id', 'units')
+    )
+    products = Product.objects.filter(pk__in=totals).values_list('pk', 'store_id', 'category')
+    ProductSales.objects.bulk_create([
+        ProductSales(product_id=pk, store_id=store_id, category=category, units_sold=totals[pk])
+        for pk, store_id, category in products
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_initial'),
+        ('products', '0005_categoryfacet'),
+        ('stores', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales', serialize=False, to='products.product')),
+                ('category', models.CharField(max_length=255)),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_sales', to='stores.store')),
+            ],
+            options={
+                'verbose_name': 'Product Sales',
+                'verbose_name_plural': 'Product Sales',
+                'db_table': 'ProductSales',
+                'ordering': ['-units_sold'],
+                'indexes': [models.Index(fields=['-units_sold'], name='ProductSale_units_s_952bb3_idx'), models.Index(fields=['category', '-units_sold'], name='ProductSale_categor_fbea8a_idx'), models.Index(fields=['store', '-units_sold'], name='ProductSale_store_i_dbb3bd_idx')],
+            },
+        ),
+        migrations.RunPython(populate_product_sales, migrations.RunPython.noop),
+    ]
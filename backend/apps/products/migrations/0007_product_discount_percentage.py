@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:41
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_productsales'),
+        ('stores', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='discount_percentage',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(mrp__gt=models.F('price'), then=django.db.models.functions.math.Round(django.db.models.functions.comparison.Cast(models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('mrp'), '-', models.F('price')), '*', models.Value(100.0)), '/', models.F('mrp')), output_field=models.FloatField()), models.DecimalField(decimal_places=4, max_digits=12)), 2)), default=models.Value(Decimal('0.00'))), output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='Product_price_f2d98e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-discount_percentage'], name='Product_discoun_cfd8e6_idx'),
+        ),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Value, When
+from django.db.models.functions import Cast, Round
 from apps.stores.models import Store
 import secrets
 
@@ -11,9 +14,37 @@ class Product(models.Model):
     description = models.TextField()
     mrp = models.DecimalField(max_digits=10, decimal_places=2)
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Computed by the database so it can be indexed, filtered and sorted on.
+    discount_percentage = models.GeneratedField(
+        expression=Case(
+            # The float literal forces real division on SQLite; PostgreSQL
+            # reads it as numeric, so the arithmetic stays exact there.
+            When(mrp__gt=F('price'), then=Round(Cast(
+                ExpressionWrapper((F('mrp') - F('price')) * Value(100.0) / F('mrp'), output_field=models.FloatField()),
+                models.DecimalField(max_digits=12, decimal_places=4),
+            ), 2)),
+            default=Value(Decimal('0.00')),
+        ),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        db_persist=True,
+    )
     images = models.JSONField(default=list)  # Array of image URLs
     category = models.CharField(max_length=255)
     in_stock = models.BooleanField(default=True)
+    # Units available, maintained by apps.products.inventory. Null means stock
+    # is not tracked and in_stock is set by hand.
+    stock = models.PositiveIntegerField(null=True, blank=True)
+
+    # Rating aggregates, maintained by apps.ratings.aggregates
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0)
+    rating_count_1 = models.PositiveIntegerField(default=0)
+    rating_count_2 = models.PositiveIntegerField(default=0)
+    rating_count_3 = models.PositiveIntegerField(default=0)
+    rating_count_4 = models.PositiveIntegerField(default=0)
+    rating_count_5 = models.PositiveIntegerField(default=0)
+
     store = models.ForeignKey(
         Store,
         on_delete=models.CASCADE,
@@ -31,20 +62,120 @@ class Product(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['in_stock']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['-rating_average', '-rating_count']),
+            models.Index(fields=['price']),
+            models.Index(fields=['-discount_percentage']),
         ]
 
     def __str__(self):
         return f"{self.name} - {self.store.name}"
 
+    @staticmethod
+    def generate_id():
+        """Generate a CUID-like ID."""
+        return f"cl{secrets.token_urlsafe(16)}"[:30]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so facet counts can apply deltas.
+        instance._loaded_category = instance.__dict__.get('category')
+        instance._loaded_in_stock = instance.__dict__.get('in_stock')
+        return instance
+
+    # Only changed with atomic UPDATEs (apps.products.inventory and
+    # apps.ratings.aggregates). save() never writes them after the insert, so
+    # saving a product cannot overwrite concurrent stock or rating changes.
+    ATOMIC_FIELDS = frozenset({
+        'stock', 'in_stock', 'rating_count', 'rating_sum', 'rating_average',
+        'rating_count_1', 'rating_count_2', 'rating_count_3', 'rating_count_4', 'rating_count_5',
+    })
+
+    def _non_atomic_update_fields(self, update_fields):
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.attname not in deferred
+            ]
+        return [name for name in update_fields if name not in self.ATOMIC_FIELDS]
+
     def save(self, *args, **kwargs):
         if not self.id:
-            # Generate CUID-like ID
-            self.id = f"cl{secrets.token_urlsafe(16)}"[:30]
-        super().save(*args, **kwargs)
+            self.id = self.generate_id()
+        adding = self._state.adding
+        if adding:
+            if self.stock is not None:
+                self.in_stock = self.stock > 0
+        else:
+            kwargs['update_fields'] = self._non_atomic_update_fields(kwargs.get('update_fields'))
+        # Keep the row and the denormalized counters in one transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        if not adding:
+            # Updates do not return generated columns; reload lazily on access.
+            self.__dict__.pop('discount_percentage', None)
+        if adding or 'category' in kwargs['update_fields']:
+            self._loaded_category = self.category
+        if adding:
+            self._loaded_in_stock = self.in_stock
 
     @property
-    def discount_percentage(self):
-        """Calculate discount percentage."""
-        if self.mrp > 0:
-            return round(((self.mrp - self.price) / self.mrp) * 100, 2)
-        return 0
+    def rating_histogram(self):
+        """Number of ratings per star value."""
+        return {stars: getattr(self, f'rating_count_{stars}') for stars in range(1, 6)}
+
+
+class CategoryFacet(models.Model):
+    """Precomputed product counts per category, maintained by apps.products.facets."""
+
+    category = models.CharField(primary_key=True, max_length=255)
+    product_count = models.IntegerField(default=0)
+    in_stock_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'CategoryFacet'
+        verbose_name = 'Category Facet'
+        verbose_name_plural = 'Category Facets'
+        ordering = ['category']
+
+    def __str__(self):
+        return f"{self.category} ({self.product_count})"
+
+
+class ProductSales(models.Model):
+    """
+    Units sold per product, maintained incrementally by apps.products.rankings.
+    Category and store are copied from Product so every ranking scope
+    (global, per category, per store) is a single index range scan.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='sales'
+    )
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        related_name='product_sales'
+    )
+    category = models.CharField(max_length=255)
+    units_sold = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ProductSales'
+        verbose_name = 'Product Sales'
+        verbose_name_plural = 'Product Sales'
+        ordering = ['-units_sold']
+        indexes = [
+            models.Index(fields=['-units_sold']),
+            models.Index(fields=['category', '-units_sold']),
+            models.Index(fields=['store', '-units_sold']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.units_sold} sold"
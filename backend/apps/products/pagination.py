@@ -0,0 +1,153 @@
+"""
+Pagination classes for the product catalog.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering.
+
+    Instead of COUNT(*) + OFFSET, each page filters on the ordering values of
+    the last row of the previous page, so deep pages cost the same as page 1.
+    Cursors are opaque and point at a row rather than a position, so rows
+    inserted while a client is scrolling never shift or duplicate results.
+
+    The ordering must end with a unique column (the primary key) so that
+    every row has a distinct position.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.build_seek_filter(position))
+
+        # Fetch one extra row to find out whether there is a next page.
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering tuple, letting the view override the default."""
+        if view is not None and hasattr(view, 'get_keyset_ordering'):
+            return tuple(view.get_keyset_ordering())
+        return tuple(self.ordering)
+
+    def build_seek_filter(self, position):
+        """
+        Build a lexicographic "comes after" filter for the given position.
+
+        For ordering (-a, -b) this is: a < x OR (a = x AND b < y). The leading
+        a <= x term is redundant but lets the planner use the index on a.
+        """
+        fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+        seek = Q()
+        equal = Q()
+        for (field, descending), value in zip(fields, position):
+            lookup = 'lt' if descending else 'gt'
+            seek |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+
+        first_field, first_descending = fields[0]
+        bound = 'lte' if first_descending else 'gte'
+        return Q(**{f'{first_field}__{bound}': position[0]}) & seek
+
+    def encode_cursor(self, instance):
+        values = []
+        for name in self.ordering:
+            value = getattr(instance, name.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+
+        payload = json.dumps({'o': ','.join(self.ordering), 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _cursor_field(model, name):
+        field = model._meta.get_field(name.lstrip('-'))
+        # Generated columns convert values through their output field.
+        return field.output_field if getattr(field, 'generated', False) else field
+
+    def decode_cursor(self, request, model):
+        """Decode the cursor query parameter into a tuple of field values."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != ','.join(self.ordering) or len(payload['v']) != len(self.ordering):
+                raise ValueError('Cursor does not match the requested ordering.')
+            return tuple(
+                self._cursor_field(model, name).to_python(value)
+                for name, value in zip(self.ordering, payload['v'])
+            )
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+
+class ProductCursorPagination(KeysetPagination):
+    """
+    Cursor pagination for the product catalog (infinite scroll on /shop).
+    Pages on (created_at, id) using the Product -created_at index.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,14 @@
+from rest_framework import permissions
+
+
+class IsSeller(permissions.BasePermission):
+    """Allow access only to users who own an approved, active store."""
+
+    message = 'You need an approved, active store to perform this action.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        store = getattr(user, 'store', None)
+        return store is not None and store.status == 'approved' and store.is_active
@@ -0,0 +1,85 @@
+"""
+Incrementally maintained best-selling rankings (ProductSales).
+"""
+from collections import Counter
+
+from django.db.models import Case, F, Sum, Value, When
+
+from apps.common.cache import bump_generation_on_commit
+
+from .models import Product, ProductSales
+
+
+def record_sales(quantities, products=None):
+    """
+    Add sold quantities to the rankings in a constant number of queries.
+
+    quantities maps product_id to a (possibly negative) unit delta. products
+    optionally maps product_id to an already loaded Product, which saves a
+    lookup. Call it inside the transaction that writes the order items.
+    """
+    quantities = {pk: qty for pk, qty in quantities.items() if qty}
+    if not quantities:
+        return
+
+    if products is None:
+        products = Product.objects.only('pk', 'store_id', 'category').in_bulk(list(quantities))
+    ProductSales.objects.bulk_create(
+        [
+            ProductSales(product_id=pk, store_id=products[pk].store_id, category=products[pk].category)
+            # Removals never create rows: during a cascade delete the
+            # ProductSales row may already be gone.
+            for pk, qty in quantities.items() if qty > 0 and pk in products
+        ],
+        ignore_conflicts=True,
+    )
+    ProductSales.objects.filter(product_id__in=list(quantities)).update(
+        units_sold=F('units_sold') + Case(
+            *[When(product_id=pk, then=Value(qty)) for pk, qty in quantities.items()],
+            default=Value(0),
+        )
+    )
+
+    bump_generation_on_commit('rankings')
+
+
+def record_order_items(items):
+    """Add a batch of OrderItem objects (with product set) to the rankings."""
+    quantities = Counter()
+    products = {}
+    for item in items:
+        quantities[item.product_id] += item.quantity
+        products[item.product_id] = item.product
+    record_sales(quantities, products=products)
+
+
+def rebuild_product_sales(batch_size=1000):
+    """
+    Recompute ProductSales from the OrderItem table.
+    Returns the number of rows created, updated or deleted.
+    """
+    from apps.orders.models import OrderItem
+
+    totals = dict(
+        OrderItem.objects.values('product_id').annotate(units=Sum('quantity')).values_list('product_id', 'units')
+    )
+    stored = {sales.product_id: sales for sales in ProductSales.objects.all()}
+
+    to_create = []
+    to_update = []
+    products = Product.objects.filter(pk__in=totals).values_list('pk', 'store_id', 'category')
+    for product_id, store_id, category in products.iterator(chunk_size=batch_size):
+        units = totals[product_id]
+        sales = stored.pop(product_id, None)
+        if sales is None:
+            to_create.append(ProductSales(product_id=product_id, store_id=store_id, category=category, units_sold=units))
+        elif (sales.units_sold, sales.store_id, sales.category) != (units, store_id, category):
+            sales.units_sold, sales.store_id, sales.category = units, store_id, category
+            to_update.append(sales)
+
+    ProductSales.objects.bulk_create(to_create, batch_size=batch_size)
+    ProductSales.objects.bulk_update(to_update, ['units_sold', 'store', 'category'], batch_size=batch_size)
+    ProductSales.objects.filter(product_id__in=list(stored)).delete()
+
+    bump_generation_on_commit('rankings')
+    return len(to_create) + len(to_update) + len(stored)
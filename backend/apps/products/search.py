@@ -0,0 +1,200 @@
+"""
+Full-text product search.
+
+PostgreSQL uses a weighted tsvector over name, category and description
+backed by a GIN expression index (see migration 0003). Other databases
+(SQLite in tests and local development) use an in-process inverted index
+that is built lazily and kept up to date by Product signals.
+"""
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+
+from .models import Product
+
+SEARCH_CONFIG = 'english'
+
+# Same field weights as the tsvector below (PostgreSQL's default A/B/C weights).
+FIELD_WEIGHTS = {
+    'name': 1.0,
+    'category': 0.4,
+    'description': 0.2,
+}
+
+# Must match the GIN index expression exactly for PostgreSQL to use the index.
+PRODUCT_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('category', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+)
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with',
+})
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split text into lowercase search terms, dropping stop words."""
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOP_WORDS]
+
+
+class PostgresSearchBackend:
+    """Ranked search using tsvector/tsquery and the GIN expression index."""
+
+    def search(self, query_text, queryset):
+        query = SearchQuery(query_text, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            queryset
+            .annotate(search=PRODUCT_SEARCH_VECTOR)
+            .filter(search=query)
+            .annotate(rank=SearchRank(PRODUCT_SEARCH_VECTOR, query))
+            .order_by('-rank', '-created_at', '-id')
+        )
+
+
+class RankedResults:
+    """
+    Lazy, sliceable sequence of ranked products.
+    Only the products of the requested slice are loaded from the database,
+    so it can be paginated like a queryset.
+    """
+
+    def __init__(self, ranked_ids, queryset):
+        self.ranked_ids = ranked_ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ranked_ids)
+
+    def count(self):
+        return len(self.ranked_ids)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+
+        window = self.ranked_ids[key]
+        products = self.queryset.in_bulk([product_id for product_id, _ in window])
+        results = []
+        for product_id, rank in window:
+            product = products.get(product_id)
+            if product is not None:
+                product.rank = rank
+                results.append(product)
+        return results
+
+
+class InvertedIndexSearchBackend:
+    """
+    In-process inverted index used when PostgreSQL is not available.
+    Scores with TF-IDF using the same per-field weights as the tsvector.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(dict)  # term -> {product_id: weight}
+        self._documents = {}  # product_id -> set of terms
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = Product.objects.values_list('id', 'name', 'category', 'description')
+            for product_id, name, category, description in rows.iterator(chunk_size=2000):
+                self._add(product_id, name=name, category=category, description=description)
+            self._loaded = True
+
+    def _add(self, product_id, **fields):
+        weights = defaultdict(float)
+        for field, text in fields.items():
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+
+        for term, weight in weights.items():
+            self._postings[term][product_id] = weight
+        self._documents[product_id] = set(weights)
+
+    def _remove(self, product_id):
+        for term in self._documents.pop(product_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def index_product(self, product):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(product.pk)
+            self._add(product.pk, name=product.name, category=product.category,
+                      description=product.description)
+
+    def remove_product(self, product_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(product_id)
+
+    def reset(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._loaded = False
+
+    def search(self, query_text, queryset):
+        self._ensure_loaded()
+        terms = set(tokenize(query_text))
+        if not terms:
+            return RankedResults([], queryset)
+
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            total = max(len(self._documents), 1)
+
+        # Every term must match (same semantics as a websearch tsquery).
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting.keys()
+
+        scores = defaultdict(float)
+        for posting in postings:
+            idf = math.log(1 + total / len(posting)) if posting else 0.0
+            for product_id in candidates:
+                scores[product_id] += posting[product_id] * idf
+
+        allowed = set(queryset.filter(pk__in=scores).values_list('pk', flat=True))
+        ranked = sorted(
+            ((product_id, score) for product_id, score in scores.items() if product_id in allowed),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return RankedResults(ranked, queryset)
+
+
+_inverted_index = InvertedIndexSearchBackend()
+_postgres_backend = PostgresSearchBackend()
+
+
+def get_search_backend():
+    """Return the search backend for the current database."""
+    if connection.vendor == 'postgresql':
+        return _postgres_backend
+    return _inverted_index
+
+
+def search_products(query_text, queryset=None):
+    """Return products matching query_text, best matches first."""
+    if queryset is None:
+        queryset = Product.objects.all()
+    return get_search_backend().search(query_text, queryset)
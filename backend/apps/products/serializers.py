@@ -0,0 +1,66 @@
+from rest_framework import serializers
+from apps.users.validators import validate_image_file_extension, validate_image_file_size
+from .images import derivative_urls
+from .models import CategoryFacet, Product
+
+
+class ProductSerializer(serializers.ModelSerializer):
+    """Serializer for Product model."""
+
+    store_name = serializers.CharField(source='store.name', read_only=True)
+    store_username = serializers.CharField(source='store.username', read_only=True)
+    discount_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    thumbnails = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = (
+            'id', 'name', 'description', 'mrp', 'price', 'discount_percentage',
+            'images', 'thumbnails', 'category', 'in_stock', 'stock', 'store', 'store_name', 'store_username',
+            'rating_count', 'rating_average', 'rating_histogram',
+            'created_at', 'updated_at',
+        )
+        read_only_fields = ('id', 'stock', 'store', 'rating_count', 'rating_average', 'created_at', 'updated_at')
+
+    def get_thumbnails(self, obj):
+        """WebP derivative URLs ({width: url}) for each entry in images."""
+        return [derivative_urls(url) for url in obj.images]
+
+
+class ProductSearchSerializer(ProductSerializer):
+    """Product serializer with the search relevance score."""
+
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ('rank',)
+
+
+class ProductRankingSerializer(ProductSerializer):
+    """Product serializer with units sold, for top-N rankings."""
+
+    units_sold = serializers.IntegerField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ('units_sold',)
+
+
+class CategoryFacetSerializer(serializers.ModelSerializer):
+    """Serializer for per-category product counts."""
+
+    class Meta:
+        model = CategoryFacet
+        fields = ('category', 'product_count', 'in_stock_count')
+
+
+class ProductImageUploadSerializer(serializers.Serializer):
+    """Serializer for uploading product images."""
+
+    images = serializers.ListField(
+        child=serializers.ImageField(
+            validators=[validate_image_file_extension, validate_image_file_size]
+        ),
+        allow_empty=False,
+        max_length=10,
+    )
@@ -0,0 +1,85 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.common.cache import bump_generation_on_commit
+
+from .facets import apply_product_change
+from .models import Product, ProductSales
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, **kwargs):
+    """Keep the in-process search index in sync (no-op on PostgreSQL)."""
+    backend = get_search_backend()
+    if hasattr(backend, 'index_product'):
+        backend.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product_for_search(sender, instance, **kwargs):
+    backend = get_search_backend()
+    if hasattr(backend, 'remove_product'):
+        backend.remove_product(instance.pk)
+
+
+def _load_stored_facet_state(instance):
+    """
+    Fill in _loaded_category/_loaded_in_stock from the database when the
+    instance was loaded without them (deferred fields, or built by hand).
+    """
+    if getattr(instance, '_loaded_category', None) is not None and getattr(instance, '_loaded_in_stock', None) is not None:
+        return
+    stored = Product.objects.filter(pk=instance.pk).values_list('category', 'in_stock').first()
+    if stored is not None:
+        instance._loaded_category, instance._loaded_in_stock = stored
+
+
+@receiver(pre_save, sender=Product)
+def load_facet_state_on_save(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    loaded_category = getattr(instance, '_loaded_category', None)
+    if loaded_category is not None and instance.__dict__.get('category') != loaded_category:
+        # Moving categories moves the stored in_stock with it; read it fresh.
+        instance._loaded_in_stock = None
+    _load_stored_facet_state(instance)
+
+
+@receiver(pre_delete, sender=Product)
+def load_facet_state_on_delete(sender, instance, **kwargs):
+    _load_stored_facet_state(instance)
+
+
+@receiver(post_save, sender=Product)
+def update_category_facets_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_product_change(new_category=instance.category, new_in_stock=instance.in_stock)
+        return
+    old_category = getattr(instance, '_loaded_category', None)
+    if update_fields is not None and 'category' not in update_fields:
+        return
+    if old_category is None or old_category == instance.category:
+        # Updates never write in_stock (see Product.ATOMIC_FIELDS).
+        return
+    apply_product_change(
+        old_category=old_category,
+        old_in_stock=instance._loaded_in_stock,
+        new_category=instance.category,
+        new_in_stock=instance._loaded_in_stock,
+    )
+    ProductSales.objects.filter(product=instance).update(category=instance.category)
+
+
+@receiver(post_delete, sender=Product)
+def update_category_facets_on_delete(sender, instance, **kwargs):
+    apply_product_change(
+        old_category=getattr(instance, '_loaded_category', None),
+        old_in_stock=getattr(instance, '_loaded_in_stock', None),
+    )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, **kwargs):
+    bump_generation_on_commit('products')
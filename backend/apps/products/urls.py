@@ -1,12 +1,27 @@
 from django.urls import path
+from .views import (
+    CategoryFacetListView,
+    ProductDetailView,
+    ProductExportView,
+    ProductImageUploadView,
+    ProductImportView,
+    ProductListView,
+    ProductSearchView,
+    ProductTopView,
+)
 
 app_name = 'products'
 
 urlpatterns = [
-    # Product endpoints will be added here
-    # GET /api/products/ - List products
+    path('', ProductListView.as_view(), name='product_list'),
+    path('search/', ProductSearchView.as_view(), name='product_search'),
+    path('facets/', CategoryFacetListView.as_view(), name='category_facets'),
+    path('top/', ProductTopView.as_view(), name='product_top'),
+    path('import/', ProductImportView.as_view(), name='product_import'),
+    path('export/', ProductExportView.as_view(), name='product_export'),
+    path('images/', ProductImageUploadView.as_view(), name='product_image_upload'),
     # POST /api/products/ - Create product (seller only)
-    # GET /api/products/{id}/ - Product detail
+    path('<str:pk>/', ProductDetailView.as_view(), name='product_detail'),
     # PUT /api/products/{id}/ - Update product (seller only)
     # DELETE /api/products/{id}/ - Delete product (seller only)
 ]
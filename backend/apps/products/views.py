@@ -0,0 +1,331 @@
+from decimal import Decimal, InvalidOperation
+from django.http import StreamingHttpResponse
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.exceptions import UnsupportedMediaType
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.common.cache import CachedResponseMixin, get_generations
+from apps.common.conditional import ConditionalResponseMixin
+from .bulk import (
+    export_products_csv,
+    export_products_ndjson,
+    import_products,
+    iter_csv_rows,
+    iter_ndjson_rows,
+)
+from .images import ImageWorkersUnavailable, InvalidImage, detect_extension, process_uploads
+from .models import CategoryFacet, Product, ProductSales
+from .pagination import ProductCursorPagination
+from .permissions import IsSeller
+from .search import search_products
+from .serializers import (
+    CategoryFacetSerializer,
+    ProductImageUploadSerializer,
+    ProductRankingSerializer,
+    ProductSearchSerializer,
+    ProductSerializer,
+)
+
+
+class ProductListView(CachedResponseMixin, ConditionalResponseMixin, generics.ListAPIView):
+    """
+    API endpoint to list the product catalog.
+    GET /api/products/?cursor=<opaque>&page_size=<n>&ordering=<...>
+    Filters: min_rating, min_price, max_price, min_discount, max_discount.
+    Orderings: newest, rating, price_low, price_high, discount.
+    Uses keyset pagination: follow the `next` link to load more.
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+    cache_namespaces = ('products', 'stores')
+
+    # Every ordering ends with the primary key so keyset cursors are unique.
+    orderings = {
+        'newest': ('-created_at', '-id'),
+        'rating': ('-rating_average', '-rating_count', '-id'),
+        'price_low': ('price', 'id'),
+        'price_high': ('-price', '-id'),
+        'discount': ('-discount_percentage', '-id'),
+    }
+
+    # Query parameter -> field lookup; all are backed by an index.
+    range_filters = {
+        'min_rating': 'rating_average__gte',
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+        'min_discount': 'discount_percentage__gte',
+        'max_discount': 'discount_percentage__lte',
+    }
+    default_ordering = 'newest'
+
+    def get_keyset_ordering(self):
+        ordering = self.request.query_params.get('ordering', self.default_ordering)
+        if ordering not in self.orderings:
+            raise serializers.ValidationError({
+                'ordering': f'Must be one of: {", ".join(self.orderings)}.'
+            })
+        return self.orderings[ordering]
+
+    def get_validators(self):
+        # The page is fetched here once and reused by list(), so validating
+        # costs no extra query. Catalog writes bump the generations; the page
+        # rows catch anything else that changes what this page shows.
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        rows = [(product.pk, product.updated_at, product.store.updated_at) for product in page]
+        parts = (
+            self.request.get_full_path(),
+            *get_generations(self.cache_namespaces),
+            self.paginator.has_next,
+            *rows,
+        )
+        # No Last-Modified: a row leaving the page does not make the page newer.
+        return parts, None
+
+    def paginate_queryset(self, queryset):
+        if not hasattr(self, '_page'):
+            self._page = super().paginate_queryset(queryset)
+        return self._page
+
+    def get_queryset(self):
+        queryset = Product.objects.select_related('store')
+
+        for param, lookup in self.range_filters.items():
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                value = Decimal(value)
+            except InvalidOperation:
+                raise serializers.ValidationError({param: 'A valid number is required.'})
+            if not value.is_finite():
+                raise serializers.ValidationError({param: 'A valid number is required.'})
+            queryset = queryset.filter(**{lookup: value})
+
+        return queryset
+
+
+class ProductDetailView(CachedResponseMixin, ConditionalResponseMixin, generics.RetrieveAPIView):
+    """
+    API endpoint to retrieve a single product.
+    GET /api/products/{id}/
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = ProductSerializer
+    cache_namespaces = ('products', 'stores')
+
+    def get_validators(self):
+        row = (
+            Product.objects
+            .filter(pk=self.kwargs['pk'])
+            .values_list('updated_at', 'store__updated_at')
+            .first()
+        )
+        if row is None:
+            return None
+        return row, max(row)
+
+    def get_queryset(self):
+        return Product.objects.select_related('store')
+
+
+class ProductSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ProductSearchView(CachedResponseMixin, generics.ListAPIView):
+    """
+    API endpoint for full-text product search over name, category and description.
+    GET /api/products/search/?q=<terms>&page=<n>
+    Results are ordered by relevance.
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = ProductSearchSerializer
+    pagination_class = ProductSearchPagination
+    cache_namespaces = ('products', 'stores')
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            return Product.objects.none()
+        return search_products(query, Product.objects.select_related('store'))
+
+
+class ProductTopView(CachedResponseMixin, generics.ListAPIView):
+    """
+    API endpoint for the top N products, globally, per category or per store.
+    GET /api/products/top/?by=<best_selling|latest>&category=<name>&store=<id>&limit=<n>
+    Best sellers are read from the precomputed ProductSales ranking table.
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = ProductRankingSerializer
+    pagination_class = None
+    cache_namespaces = ('products', 'stores', 'rankings')
+
+    default_limit = 10
+    max_limit = 50
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise serializers.ValidationError({'limit': 'A valid integer is required.'})
+        return max(1, min(limit, self.max_limit))
+
+    def get_queryset(self):
+        by = self.request.query_params.get('by', 'best_selling')
+        filters = {}
+        if self.request.query_params.get('category'):
+            filters['category'] = self.request.query_params['category']
+        if self.request.query_params.get('store'):
+            filters['store_id'] = self.request.query_params['store']
+        limit = self.get_limit()
+
+        if by == 'latest':
+            products = list(
+                Product.objects.select_related('store')
+                .filter(**filters)
+                .order_by('-created_at', '-id')[:limit]
+            )
+            for product in products:
+                product.units_sold = None
+            return products
+
+        if by != 'best_selling':
+            raise serializers.ValidationError({'by': 'Must be one of: best_selling, latest.'})
+
+        ranked = (
+            ProductSales.objects
+            .filter(units_sold__gt=0, **filters)
+            .select_related('product__store')
+            .order_by('-units_sold', 'product_id')[:limit]
+        )
+        products = []
+        for sales in ranked:
+            sales.product.units_sold = sales.units_sold
+            products.append(sales.product)
+        return products
+
+
+class CategoryFacetListView(CachedResponseMixin, generics.ListAPIView):
+    """
+    API endpoint to list categories with their product counts.
+    GET /api/products/facets/?in_stock=true
+    Reads the precomputed CategoryFacet table, one row per category.
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = CategoryFacetSerializer
+    pagination_class = None
+    cache_namespaces = ('products',)
+
+    def get_queryset(self):
+        queryset = CategoryFacet.objects.filter(product_count__gt=0)
+        if self.request.query_params.get('in_stock', '').lower() in ('1', 'true'):
+            queryset = queryset.filter(in_stock_count__gt=0)
+        return queryset
+
+
+class ProductImportView(APIView):
+    """
+    API endpoint for sellers to bulk import products into their store.
+    POST /api/products/import/
+    Body is streamed as CSV (Content-Type: text/csv, header row required,
+    images separated by "|") or NDJSON (Content-Type: application/x-ndjson).
+    Returns counts and a per-row error report.
+    """
+    permission_classes = (permissions.IsAuthenticated, IsSeller)
+
+    readers = {
+        'text/csv': iter_csv_rows,
+        'application/x-ndjson': iter_ndjson_rows,
+        'application/jsonl': iter_ndjson_rows,
+    }
+
+    def post(self, request):
+        content_type = request.content_type.split(';')[0].strip().lower()
+        reader = self.readers.get(content_type)
+        if reader is None:
+            raise UnsupportedMediaType(content_type)
+
+        # Read the raw body lazily instead of parsing request.data.
+        report = import_products(request.user.store, reader(request.stream or ()))
+
+        response_status = status.HTTP_201_CREATED if report.created and not report.error else status.HTTP_400_BAD_REQUEST
+        return Response(report.as_dict(), status=response_status)
+
+
+class ProductExportView(APIView):
+    """
+    API endpoint for sellers to export all products of their store.
+    GET /api/products/export/?file_format=<csv|ndjson>
+    The file is streamed, so memory use does not grow with the catalog size.
+    """
+    permission_classes = (permissions.IsAuthenticated, IsSeller)
+
+    exporters = {
+        'csv': (export_products_csv, 'text/csv'),
+        'ndjson': (export_products_ndjson, 'application/x-ndjson'),
+    }
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in self.exporters:
+            raise serializers.ValidationError({
+                'file_format': f'Must be one of: {", ".join(self.exporters)}.'
+            })
+
+        exporter, content_type = self.exporters[file_format]
+        store = request.user.store
+        response = StreamingHttpResponse(exporter(store), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{store.username}-products.{file_format}"'
+        return response
+
+
+class ProductImageUploadView(APIView):
+    """
+    API endpoint for sellers to upload product images.
+    POST /api/products/images/ (multipart, one or more "images" files)
+    Stores each image once per content hash and returns its URL together
+    with WebP thumbnail URLs; use the URL in Product.images.
+    """
+    permission_classes = (permissions.IsAuthenticated, IsSeller)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request):
+        serializer = ProductImageUploadSerializer(data={'images': request.FILES.getlist('images')})
+        serializer.is_valid(raise_exception=True)
+
+        files = []
+        for upload in serializer.validated_data['images']:
+            upload.seek(0)
+            data = upload.read()
+            extension = detect_extension(data)
+            if extension is None:
+                raise serializers.ValidationError({'images': f'{upload.name} is not a supported image.'})
+            files.append((data, extension))
+
+        try:
+            stored = process_uploads(files)
+        except InvalidImage as exc:
+            raise serializers.ValidationError({'images': str(exc)})
+        except ImageWorkersUnavailable as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return Response({
+            'images': [
+                {
+                    'url': request.build_absolute_uri(image.original_url),
+                    'thumbnails': {
+                        width: request.build_absolute_uri(url)
+                        for width, url in image.thumbnails.items()
+                    },
+                    'hash': image.content_hash,
+                    'deduplicated': not image.created,
+                }
+                for image in stored
+            ]
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,102 @@
+"""
+Incremental maintenance of the rating aggregate columns on Product.
+"""
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Now
+
+from apps.products.models import Product
+
+STAR_VALUES = range(1, 6)
+
+
+def apply_rating_change(product_id, added=None, removed=None):
+    """
+    Adjust a product's aggregates for one rating being added and/or removed.
+
+    Runs as a single UPDATE with F() expressions, so concurrent ratings on
+    the same product never lose updates. Call it inside the transaction that
+    writes the Rating row.
+    """
+    if added == removed:
+        return
+
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+
+    updates = {
+        'rating_count': F('rating_count') + count_delta,
+        'rating_sum': F('rating_sum') + sum_delta,
+    }
+    if added is not None:
+        updates[f'rating_count_{added}'] = F(f'rating_count_{added}') + 1
+    if removed is not None:
+        updates[f'rating_count_{removed}'] = F(f'rating_count_{removed}') - 1
+
+    # SET expressions see the pre-update row, so derive the new average from
+    # the same deltas.
+    new_sum = Cast(F('rating_sum') + sum_delta, FloatField())
+    new_count = NullIf(F('rating_count') + count_delta, Value(0))
+    updates['rating_average'] = Coalesce(new_sum / new_count, Value(0.0), output_field=FloatField())
+    # Ratings are part of the product payload, so the product has changed too.
+    updates['updated_at'] = Now()
+
+    Product.objects.filter(pk=product_id).update(**updates)
+
+
+def compute_rating_aggregates(product_ids):
+    """Compute aggregates from the Rating table for the given products."""
+    from .models import Rating
+
+    rows = (
+        Rating.objects
+        .filter(product_id__in=product_ids)
+        .values('product_id')
+        .annotate(
+            count=Count('id'),
+            total=Sum('rating'),
+            **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars in STAR_VALUES},
+        )
+    )
+    return {row['product_id']: row for row in rows}
+
+
+def rebuild_rating_aggregates(batch_size=1000):
+    """
+    Recompute every product's aggregates from scratch.
+    Returns the number of products whose stored aggregates were corrected.
+    """
+    fields = ['rating_count', 'rating_sum', 'rating_average'] + [f'rating_count_{s}' for s in STAR_VALUES]
+    corrected = 0
+    last_pk = None
+
+    while True:
+        batch = Product.objects.order_by('pk').only('pk', *fields)
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        products = list(batch[:batch_size])
+        if not products:
+            return corrected
+        last_pk = products[-1].pk
+
+        aggregates = compute_rating_aggregates([p.pk for p in products])
+        changed = []
+        for product in products:
+            row = aggregates.get(product.pk)
+            expected = {
+                'rating_count': row['count'] if row else 0,
+                'rating_sum': row['total'] if row else 0,
+            }
+            expected['rating_average'] = (
+                expected['rating_sum'] / expected['rating_count'] if expected['rating_count'] else 0.0
+            )
+            for stars in STAR_VALUES:
+                expected[f'rating_count_{stars}'] = row[f'stars_{stars}'] if row else 0
+
+            if any(getattr(product, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(product, field, value)
+                changed.append(product)
+
+        if changed:
+            Product.objects.bulk_update(changed, fields)
+            corrected += len(changed)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.ratings.aggregates import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute the Product rating aggregate columns from the Rating table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of products processed per batch (default: 1000).',
+        )
+
+    def handle(self, *args, **options):
+        corrected = rebuild_rating_aggregates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rating aggregates rebuilt; {corrected} product(s) corrected.'
+        ))
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.products.models import Product
@@ -41,8 +41,24 @@ class Rating(models.Model):
     def __str__(self):
         return f"{self.rating}⭐ - {self.product.name} by {self.user.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so aggregate updates can apply deltas.
+        # Deferred ones are loaded by the pre_save/pre_delete signals instead.
+        if 'rating' in instance.__dict__ and 'product_id' in instance.__dict__:
+            instance._loaded_rating = instance.rating
+            instance._loaded_product_id = instance.product_id
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.id:
             # Generate CUID-like ID
             self.id = f"cl{secrets.token_urlsafe(16)}"[:30]
-        super().save(*args, **kwargs)
+            # A new row: nothing stored to diff against.
+            self._loaded_rating = self._loaded_product_id = None
+        # Keep the row and the Product rating aggregates in one transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_rating = self.rating
+        self._loaded_product_id = self.product_id
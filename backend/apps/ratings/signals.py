@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.common.cache import bump_generation_on_commit
+
+from .aggregates import apply_rating_change
+from .models import Rating
+
+
+def _load_stored_rating(instance):
+    """
+    Fill in _loaded_rating/_loaded_product_id from the database when the
+    instance was not loaded from it (deferred fields, or built by hand).
+    """
+    if hasattr(instance, '_loaded_rating') and hasattr(instance, '_loaded_product_id'):
+        return
+    stored = Rating.objects.filter(pk=instance.pk).values_list('rating', 'product_id').first()
+    instance._loaded_rating, instance._loaded_product_id = stored or (None, None)
+
+
+@receiver(pre_save, sender=Rating)
+def load_rating_on_save(sender, instance, **kwargs):
+    _load_stored_rating(instance)
+
+
+@receiver(pre_delete, sender=Rating)
+def load_rating_on_delete(sender, instance, **kwargs):
+    _load_stored_rating(instance)
+
+
+@receiver(post_save, sender=Rating)
+def update_aggregates_on_save(sender, instance, created, **kwargs):
+    """Apply the rating delta to the product aggregates."""
+    old_rating = None if created else getattr(instance, '_loaded_rating', None)
+    old_product_id = None if created else getattr(instance, '_loaded_product_id', None)
+
+    if old_product_id is not None and old_product_id != instance.product_id:
+        apply_rating_change(old_product_id, removed=old_rating)
+        old_rating = None
+    apply_rating_change(instance.product_id, added=instance.rating, removed=old_rating)
+    # Aggregates are written with a queryset update, which sends no Product signals.
+    bump_generation_on_commit('products')
+
+
+@receiver(post_delete, sender=Rating)
+def update_aggregates_on_delete(sender, instance, **kwargs):
+    # Deletes (including cascades) already run inside a transaction.
+    removed = getattr(instance, '_loaded_rating', None) or instance.rating
+    product_id = getattr(instance, '_loaded_product_id', None) or instance.product_id
+    apply_rating_change(product_id, removed=removed)
+    bump_generation_on_commit('products')
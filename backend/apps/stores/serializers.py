@@ -0,0 +1,14 @@
+from rest_framework import serializers
+from .models import Store
+
+
+class StoreSerializer(serializers.ModelSerializer):
+    """Public serializer for Store model."""
+
+    class Meta:
+        model = Store
+        fields = (
+            'id', 'name', 'description', 'username', 'address', 'logo',
+            'email', 'contact', 'created_at', 'updated_at',
+        )
+        read_only_fields = fields
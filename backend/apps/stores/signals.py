@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.cache import bump_generation_on_commit
+
+from .models import Store
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store_cache(sender, **kwargs):
+    bump_generation_on_commit('stores')
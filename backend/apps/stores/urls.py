@@ -1,11 +1,11 @@
 from django.urls import path
+from .views import StoreListView, StoreDetailView
 
 app_name = 'stores'
 
 urlpatterns = [
-    # Store endpoints will be added here
-    # GET /api/stores/ - List stores
+    path('', StoreListView.as_view(), name='store_list'),
     # POST /api/stores/ - Create store
-    # GET /api/stores/{username}/ - Store detail by username
+    path('<slug:username>/', StoreDetailView.as_view(), name='store_detail'),
     # PUT /api/stores/{id}/ - Update store (seller only)
 ]
@@ -0,0 +1,43 @@
+from rest_framework import generics, permissions
+from apps.common.cache import CachedResponseMixin
+from apps.common.conditional import ConditionalResponseMixin
+from .models import Store
+from .serializers import StoreSerializer
+
+
+class StoreListView(CachedResponseMixin, generics.ListAPIView):
+    """
+    API endpoint to list approved, active stores.
+    GET /api/stores/
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = StoreSerializer
+    cache_namespaces = ('stores',)
+
+    def get_queryset(self):
+        return Store.objects.filter(status='approved', is_active=True)
+
+
+class StoreDetailView(CachedResponseMixin, ConditionalResponseMixin, generics.RetrieveAPIView):
+    """
+    API endpoint to retrieve a store by its username.
+    GET /api/stores/{username}/
+    """
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = StoreSerializer
+    lookup_field = 'username'
+    cache_namespaces = ('stores',)
+
+    def get_validators(self):
+        last_modified = (
+            self.get_queryset()
+            .filter(username=self.kwargs['username'])
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if last_modified is None:
+            return None
+        return (self.kwargs['username'], last_modified), last_modified
+
+    def get_queryset(self):
+        return Store.objects.filter(status='approved', is_active=True)
@@ -0,0 +1,107 @@
+"""
+JWT authentication without a User query on most requests.
+
+simplejwt's JWTAuthentication loads the user by id on every request. This
+authenticator keeps recently seen users in a small per-process LRU for
+JWT_USER_CACHE_TTL seconds instead. Saving or deleting a user evicts it
+(see signals), so deactivation and password changes apply at once in the
+process that made them and within the TTL everywhere else.
+
+The cart column changes often and is deferred, so views that read
+request.user.cart load it fresh. Each request gets its own copy of the
+cached user, so changes made while handling one request never leak into
+another.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFERRED_FIELDS = ('cart',)
+
+
+def get_ttl():
+    return getattr(settings, 'JWT_USER_CACHE_TTL', 30)
+
+
+def get_max_size():
+    return getattr(settings, 'JWT_USER_CACHE_SIZE', 1024)
+
+
+class UserCache:
+    """Thread-safe LRU of user instances with a per-entry TTL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, user)
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, user_id, user, ttl):
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > get_max_size():
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves users from user_cache when it can."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = (
+                    self.user_model.objects
+                    .defer(*DEFERRED_FIELDS)
+                    .get(**{api_settings.USER_ID_FIELD: user_id})
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            ttl = get_ttl()
+            if ttl > 0:
+                user_cache.set(user_id, user, ttl)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return copy.copy(user)
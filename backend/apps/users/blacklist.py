@@ -0,0 +1,175 @@
+"""
+Fast refresh-token revocation checks and blacklist pruning.
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION every refresh
+blacklists the old token, and simplejwt checks the blacklist with a query
+on every refresh. revocation_filter is a per-process Bloom filter of the
+blacklisted JTIs. It is topped up incrementally every
+TOKEN_REVOCATION_SYNC_INTERVAL seconds and rebuilt periodically so expired
+tokens drop out. Rebuilds read the whole blacklist, so they run in a
+background thread while requests keep using the previous filter; until the
+first one finishes every check goes to the database. A "not present" answer
+is definite, so the common case (a token that was never revoked) needs no
+query. A "maybe" answer falls back to the database.
+
+A token blacklisted by another process since the last sync can pass the
+filter. Rotation catches that case: blacklisting a token that is already
+blacklisted rejects the refresh (see apps.users.tokens).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+REBUILD_INTERVAL = 6 * 3600  # seconds
+# Ids are assigned before commit, so rows can appear slightly out of order.
+SYNC_LOOKBACK = 1000
+
+
+def get_capacity():
+    return getattr(settings, 'TOKEN_REVOCATION_FILTER_CAPACITY', 1000000)
+
+
+def get_sync_interval():
+    return getattr(settings, 'TOKEN_REVOCATION_SYNC_INTERVAL', 5)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on BLAKE2b)."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Add key; count only grows when a bit changed, so re-adding a key is free."""
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        self.count += added
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationFilter:
+    """Per-process filter of blacklisted JTIs (see module docstring)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._rebuilding = False
+
+    @staticmethod
+    def _load(bloom, queryset, last_id):
+        """Add the queryset's JTIs to bloom; returns the highest row id seen."""
+        for row_id, jti in queryset.values_list('id', 'token__jti').iterator(chunk_size=5000):
+            bloom.add(jti)
+            last_id = max(last_id, row_id)
+        return last_id
+
+    def _load_recent(self, bloom, last_id):
+        return self._load(bloom, BlacklistedToken.objects.filter(id__gt=last_id - SYNC_LOOKBACK), last_id)
+
+    def _needs_rebuild(self, now):
+        return (self._bloom is None or now - self._built_at > REBUILD_INTERVAL
+                or self._bloom.count > get_capacity())
+
+    def rebuild(self):
+        """Build a fresh filter from the unexpired blacklist and swap it in."""
+        bloom = BloomFilter(get_capacity())
+        last_id = self._load(bloom, BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()), 0)
+        with self._lock:
+            # Catch up on tokens blacklisted while the filter was built.
+            self._last_id = self._load_recent(bloom, last_id)
+            self._bloom = bloom
+            self._built_at = self._synced_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            self._rebuilding = False
+            # The thread's own connection; nothing else will close it.
+            connection.close()
+
+    def sync(self, force=False):
+        """Top the filter up from the database; due rebuilds start in the background."""
+        now = time.monotonic()
+        if not force and now - self._synced_at < get_sync_interval():
+            return
+        with self._lock:
+            if not force and now - self._synced_at < get_sync_interval():
+                return
+            self._synced_at = now
+            if self._needs_rebuild(now) and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(
+                    target=self._rebuild_in_background, name='revocation-filter-rebuild', daemon=True,
+                ).start()
+            if self._bloom is not None:
+                self._last_id = self._load_recent(self._bloom, self._last_id)
+
+    def might_be_revoked(self, jti):
+        """False means jti is certainly not blacklisted (as of the last sync)."""
+        self.sync()
+        bloom = self._bloom
+        return bloom is None or jti in bloom
+
+    def add(self, jti):
+        """Record a token blacklisted by this process right away."""
+        bloom = self._bloom
+        if bloom is not None:
+            with self._lock:
+                bloom.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._last_id = 0
+            self._synced_at = 0.0
+
+
+revocation_filter = RevocationFilter()
+
+
+def prune_token_blacklist(batch_size=5000, now=None):
+    """
+    Delete expired outstanding tokens and their blacklist entries in chunks
+    of batch_size, each in its own statement. Returns the number of
+    outstanding tokens deleted.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        # Oldest ids expire first, so walking the primary key finds them fast.
+        ids = list(
+            OutstandingToken.objects
+            .filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,56 @@
+"""
+Password hashing policy.
+
+PBKDF2PasswordHasher takes its work factor from PASSWORD_HASH_ITERATIONS
+instead of the value hard-coded in each Django release, so it can be sized
+for our hardware: run benchmark_password_hashing --target-ms N to calibrate
+it and see how many logins per second a worker can take.
+
+When the setting (or the preferred hasher in PASSWORD_HASHERS) changes,
+stored hashes are upgraded on the next successful login: ModelBackend calls
+check_password(), which rehashes and saves the password whenever the
+hasher's must_update() reports a different iteration count.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# OWASP's 2023 minimum for PBKDF2-HMAC-SHA256.
+MIN_RECOMMENDED_ITERATIONS = 600000
+BENCHMARK_PASSWORD = 'benchmark-password-1234'
+
+
+def get_iterations():
+    return getattr(settings, 'PASSWORD_HASH_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """pbkdf2_sha256 with PASSWORD_HASH_ITERATIONS iterations."""
+
+    @property
+    def iterations(self):
+        return get_iterations()
+
+
+def time_hash(iterations, rounds=5):
+    """Median seconds to hash one password with iterations on this core."""
+    hasher = PBKDF2PasswordHasher()
+    salt = hasher.salt()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.encode(BENCHMARK_PASSWORD, salt, iterations)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def calibrate_iterations(target_ms, rounds=5, probe=100000):
+    """
+    Iterations that take about target_ms to hash on this core, rounded to
+    10,000. PBKDF2's cost is linear in iterations, so one probe is enough.
+    """
+    seconds = time_hash(probe, rounds)
+    iterations = probe * target_ms / 1000 / seconds
+    return max(int(round(iterations, -4)), 10000)
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand
+
+from apps.users.hashers import (
+    BENCHMARK_PASSWORD,
+    MIN_RECOMMENDED_ITERATIONS,
+    calibrate_iterations,
+    get_iterations,
+    time_hash,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure password hashing cost with the current policy and report logins per second '
+        'per worker. With --target-ms, suggest PASSWORD_HASH_ITERATIONS for that latency per core.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=20, help='Password checks per thread.')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent checks, e.g. the gunicorn --threads value.')
+        parser.add_argument('--target-ms', type=float, default=None, help='Hashing latency to calibrate for.')
+
+    def handle(self, *args, **options):
+        hasher = get_hasher()
+        encoded = make_password(BENCHMARK_PASSWORD)
+        rounds, threads = options['rounds'], max(options['threads'], 1)
+
+        prefix = f'{hasher.algorithm}$'
+        if hasher.algorithm == 'pbkdf2_sha256':
+            prefix += f'{get_iterations()}$'
+        self.stdout.write(f'Hasher: {prefix.rstrip("$")}')
+        latencies = []
+        lock = threading.Lock()
+
+        def run():
+            for _ in range(rounds):
+                start = time.perf_counter()
+                check_password(BENCHMARK_PASSWORD, encoded)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000
+        self.stdout.write(f'Password check: p50 {p50:.1f} ms, p95 {p95:.1f} ms with {threads} thread(s)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Logins per second per worker: {len(latencies) / wall:.1f} '
+            f'({threads} thread(s); hashing only, database time not included)'
+        ))
+
+        outdated = User.objects.exclude(password__startswith=prefix).count()
+        self.stdout.write(f'Stored passwords that will be rehashed on next login: {outdated}')
+
+        if options['target_ms']:
+            iterations = calibrate_iterations(options['target_ms'])
+            actual = time_hash(iterations) * 1000
+            self.stdout.write(self.style.SUCCESS(
+                f'PASSWORD_HASH_ITERATIONS={iterations} takes {actual:.1f} ms per hash on this core '
+                f'(about {1000 / actual:.1f} logins per second per core).'
+            ))
+            if iterations < MIN_RECOMMENDED_ITERATIONS:
+                self.stdout.write(self.style.WARNING(
+                    f'That is below the recommended minimum of {MIN_RECOMMENDED_ITERATIONS} iterations; '
+                    'add capacity rather than lowering it.'
+                ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.blacklist import prune_token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries in chunks. '
+        'Expired tokens are rejected anyway, so their rows are no longer needed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = prune_token_blacklist(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired token(s).'))
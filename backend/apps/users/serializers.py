@@ -13,7 +13,8 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'name', 'image', 'cart', 'date_joined')
-        read_only_fields = ('id', 'date_joined')
+        # The cart is changed through /api/orders/cart/ operations.
+        read_only_fields = ('id', 'cart', 'date_joined')
 
 
 class RegisterSerializer(serializers.ModelSerializer):
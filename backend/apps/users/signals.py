@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    # Again after commit, in case a request cached the old row meanwhile.
+    user_cache.evict(instance.pk)
+    transaction.on_commit(lambda: user_cache.evict(instance.pk))
@@ -0,0 +1,44 @@
+"""
+Refresh tokens checked against the in-memory revocation filter
+(apps.users.blacklist) before the database.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .blacklist import revocation_filter
+
+
+class RefreshToken(BaseRefreshToken):
+    def check_blacklist(self):
+        # Only a filter hit (revoked, or a rare false positive) costs a query.
+        if revocation_filter.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            refresh = self.token_class(attrs['refresh'])
+            data = {'access': str(refresh.access_token)}
+            # The filter may not have seen a rotation made by another process
+            # yet; the blacklist insert itself tells us the token was used.
+            _token, created = refresh.blacklist()
+            if not created:
+                raise TokenError(_('Token is blacklisted'))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+            return data
+        return super().validate(attrs)
@@ -2,15 +2,14 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
+from apps.notifications.outbox import queue_email
 
 
 # Custom throttle classes for auth endpoints
@@ -31,6 +30,7 @@ from .serializers import (
     AddressSerializer
 )
 from .models import Address
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -159,7 +159,7 @@ class ChangePasswordView(APIView):
 class PasswordResetRequestView(APIView):
     """
     API endpoint to request password reset.
-    Sends email with reset link.
+    Queues an email with the reset link in the outbox.
     POST /api/auth/password-reset/
     """
     permission_classes = (permissions.AllowAny,)
@@ -178,21 +178,14 @@ class PasswordResetRequestView(APIView):
         # Build reset URL (frontend URL)
         reset_url = f"{settings.CORS_ALLOWED_ORIGINS[0]}/reset-password/{uid}/{token}"
 
-        # Send email
+        # Queue the email; send_queued_emails delivers it
         subject = 'Password Reset Request - SmartSales365'
         message = render_to_string('users/password_reset_email.html', {
             'user': user,
             'reset_url': reset_url,
         })
 
-        send_mail(
-            subject=subject,
-            message='',
-            html_message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+        queue_email(subject=subject, to=user.email, html_body=message)
 
         return Response({
             'message': 'Password reset email sent successfully.'
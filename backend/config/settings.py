@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'apps.orders',
     'apps.ratings',
     'apps.coupons',
+    'apps.notifications',
 ]
 
 MIDDLEWARE = [
@@ -85,6 +86,25 @@ DATABASES = {
     )
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache in production, e.g. django.core.cache.backends.redis.RedisCache
+# with redis://host:6379/0
+CACHE_BACKEND = config('CACHE_BACKEND', default='')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND or 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': config('CACHE_LOCATION', default='smartsales365'),
+    }
+}
+
+# Versioned response cache for public product/store reads (apps.common.cache).
+# Invalidation only reaches processes sharing the cache, so without a shared
+# CACHE_BACKEND it is off unless DEBUG (a single development process)
+CATALOG_CACHE_ENABLED = config('CATALOG_CACHE_ENABLED', default=bool(CACHE_BACKEND) or DEBUG, cast=bool)
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)  # seconds
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -105,6 +125,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 work factor (apps.users.hashers); calibrate it with
+# benchmark_password_hashing. Stored hashes are upgraded on the next login.
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=720000, cast=int)
+
+PASSWORD_HASHERS = [
+    'apps.users.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 LANGUAGE_CODE = 'en-us'
@@ -139,7 +171,7 @@ CORS_ALLOW_CREDENTIALS = True
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -187,19 +219,43 @@ SIMPLE_JWT = {
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.tokens.TokenRefreshSerializer',
 }
 
+# Authenticated users are kept per process for this long (apps.users.authentication);
+# deactivation reaches other processes within it. 0 disables the cache.
+JWT_USER_CACHE_TTL = config('JWT_USER_CACHE_TTL', default=30, cast=int)  # seconds
+JWT_USER_CACHE_SIZE = config('JWT_USER_CACHE_SIZE', default=1024, cast=int)
+
+# Blacklisted refresh tokens are checked against a per-process Bloom filter
+# (apps.users.blacklist) synced from the database this often. Size it above the
+# number of unexpired blacklisted tokens; past that it is rebuilt on the next sync.
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=5, cast=int)  # seconds
+TOKEN_REVOCATION_FILTER_CAPACITY = config('TOKEN_REVOCATION_FILTER_CAPACITY', default=1000000, cast=int)
+
 # Email Settings with MailerSend via Anymail
-EMAIL_BACKEND = "anymail.backends.mailersend.EmailBackend"
+# Set EMAIL_BACKEND to django.core.mail.backends.smtp.EmailBackend (with
+# EMAIL_HOST/EMAIL_PORT) for a local SMTP server, or to the console/locmem
+# backends in development.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='anymail.backends.mailersend.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
 
 ANYMAIL = {
-    "MAILERSEND_API_TOKEN": config('MAILERSEND_API_KEY'),
+    "MAILERSEND_API_TOKEN": config('MAILERSEND_API_KEY', default=''),
     "MAILERSEND_SENDER_DOMAIN": config('MAILERSEND_SENDER_DOMAIN', default=''),
 }
 
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@smartsales365.com')
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# Email outbox (apps.notifications.outbox): attempts before giving up, and
+# the delay before the first retry (doubled after each failure)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)  # seconds
+# How long sent and failed emails are kept before prune_outbound_emails deletes them
+EMAIL_OUTBOX_RETENTION = config('EMAIL_OUTBOX_RETENTION', default=604800, cast=int)  # seconds
+
 # DRF Spectacular Settings (API Documentation)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'SmartSales365 API',
@@ -249,11 +305,16 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
 
 CORS_EXPOSE_HEADERS = [
     'content-type',
     'x-csrftoken',
+    'etag',
+    'last-modified',
+    'x-cache',
+    'idempotent-replayed',
 ]
 
 # Limit which HTTP methods are allowed
@@ -278,6 +339,10 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 ALLOWED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
 MAX_UPLOAD_SIZE = 5242880  # 5 MB
 
+# Product image derivatives (apps.products.images)
+PRODUCT_IMAGE_WIDTHS = (160, 320, 640)  # WebP thumbnail widths in pixels
+PRODUCT_IMAGE_WORKERS = config('PRODUCT_IMAGE_WORKERS', default=2, cast=int)  # 0 = process inline
+
 # Password Reset Token Expiry
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour
 
@@ -296,4 +361,21 @@ AXES_COOLOFF_TIME = 1  # Hours
 # Stripe Configuration
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
-STRIPE_CURRENCY = config('STRIPE_CURRENCY', default='usd')
\ No newline at end of file
+STRIPE_CURRENCY = config('STRIPE_CURRENCY', default='usd')
+# Signing secret of the webhook endpoint (whsec_...), from the Stripe dashboard or `stripe listen`
+STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+
+# How long stock stays reserved while a buyer pays (apps.orders.reservations)
+STOCK_RESERVATION_TTL = config('STOCK_RESERVATION_TTL', default=900, cast=int)  # seconds
+# Active reservations one user may hold at a time
+STOCK_RESERVATION_MAX_PER_USER = config('STOCK_RESERVATION_MAX_PER_USER', default=3, cast=int)
+
+# How long Idempotency-Key responses are kept (apps.orders.idempotency)
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)  # seconds
+# After this long a key whose request never finished can be retried; keep it
+# above the gunicorn --timeout.
+IDEMPOTENCY_KEY_LEASE = config('IDEMPOTENCY_KEY_LEASE', default=180, cast=int)  # seconds
+
+# PostgreSQL range partitioning of Order/OrderItem by created_at (apps.orders.partitioning)
+ORDER_PARTITION_MONTHS = config('ORDER_PARTITION_MONTHS', default=1, cast=int)  # months per partition
+ORDER_PARTITION_AHEAD = config('ORDER_PARTITION_AHEAD', default=3, cast=int)  # partitions created in advance
@@ -1,5 +1,5 @@
 'use client'
-import { dummyAdminDashboardData } from "@/assets/assets"
+import axiosInstance from "@/lib/api/axios"
 import Loading from "@/components/Loading"
 import OrdersAreaChart from "@/components/OrdersAreaChart"
 import { CircleDollarSignIcon, ShoppingBasketIcon, StoreIcon, TagsIcon } from "lucide-react"
@@ -15,7 +15,7 @@ export default function AdminDashboard() {
         revenue: 0,
         orders: 0,
         stores: 0,
-        allOrders: [],
+        daily: [],
     })
 
     const dashboardCardsData = [
@@ -26,8 +26,12 @@ export default function AdminDashboard() {
     ]
 
     const fetchDashboardData = async () => {
-        setDashboardData(dummyAdminDashboardData)
-        setLoading(false)
+        try {
+            const { data } = await axiosInstance.get('/orders/stats/', { params: { days: 30 } })
+            setDashboardData(data)
+        } finally {
+            setLoading(false)
+        }
     }
 
     useEffect(() => {
@@ -56,7 +60,7 @@ export default function AdminDashboard() {
             </div>
 
             {/* Area Chart */}
-            <OrdersAreaChart allOrders={dashboardData.allOrders} />
+            <OrdersAreaChart daily={dashboardData.daily} />
         </div>
     )
 }
\ No newline at end of file
@@ -1,19 +1,12 @@
 'use client'
 import { AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts'
 
-export default function OrdersAreaChart({ allOrders }) {
+export default function OrdersAreaChart({ daily }) {
 
-    // Group orders by date
-    const ordersPerDay = allOrders.reduce((acc, order) => {
-        const date = new Date(order.createdAt).toISOString().split('T')[0] // format: YYYY-MM-DD
-        acc[date] = (acc[date] || 0) + 1
-        return acc
-    }, {})
-
-    // Convert to array for Recharts
-    const chartData = Object.entries(ordersPerDay).map(([date, count]) => ({
-        date,
-        orders: count
+    // One row per day, already aggregated by the API (/orders/stats/)
+    const chartData = daily.map((day) => ({
+        date: day.date,
+        orders: day.order_count
     }))
 
     return (
@@ -2,6 +2,21 @@ import axios from 'axios';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
+// crypto.randomUUID() only exists in secure contexts (HTTPS or localhost).
+const newIdempotencyKey = () => {
+    if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+        return crypto.randomUUID();
+    }
+    if (typeof crypto !== 'undefined' && typeof crypto.getRandomValues === 'function') {
+        const bytes = crypto.getRandomValues(new Uint8Array(16));
+        bytes[6] = (bytes[6] & 0x0f) | 0x40;
+        bytes[8] = (bytes[8] & 0x3f) | 0x80;
+        const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+        return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+    }
+    return `${Date.now().toString(16)}-${Math.random().toString(16).slice(2)}-${Math.random().toString(16).slice(2)}`;
+};
+
 // Create axios instance
 const axiosInstance = axios.create({
     baseURL: API_URL,
@@ -20,6 +35,12 @@ axiosInstance.interceptors.request.use(
                 config.headers.Authorization = `Bearer ${token}`;
             }
         }
+
+        // Order POSTs carry an Idempotency-Key. It lives on the config, so the
+        // retry after a token refresh reuses it and cannot place orders twice.
+        if (config.method === 'post' && config.url?.startsWith('/orders') && !config.headers['Idempotency-Key']) {
+            config.headers['Idempotency-Key'] = newIdempotencyKey();
+        }
         return config;
     },
     (error) => {